@@ -40,7 +40,7 @@ def get_stock_level(store: ProductStore, sku: str) -> int:
 def get_low_stock(store: ProductStore, threshold: int = 5) -> list[dict]:
     """Return products with quantity below threshold."""
     low = []
-    for p in store.list_products(page=0, per_page=1000):
+    for p in store.iter_products():
         if p.get("quantity", 0) < threshold:
             low.append(p)
     return low
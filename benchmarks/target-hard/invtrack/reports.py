@@ -12,14 +12,20 @@ from invtrack import store as store_module
 
 
 def inventory_summary(product_store) -> dict:
-    """Generate a summary of current inventory."""
-    all_products = product_store.list_products(page=0, per_page=10000)
-    total_items = sum(p.get("quantity", 0) for p in all_products)
-    total_value = sum(p.get("price", 0) * p.get("quantity", 0) for p in all_products)
-    categories = set(p.get("category", "general") for p in all_products)
+    """Generate a summary of current inventory in a single pass."""
+    total_skus = 0
+    total_items = 0
+    total_value = 0
+    categories = set()
+    for p in product_store.iter_products():
+        quantity = p.get("quantity", 0)
+        total_skus += 1
+        total_items += quantity
+        total_value += p.get("price", 0) * quantity
+        categories.add(p.get("category", "general"))
 
     return {
-        "total_skus": len(all_products),
+        "total_skus": total_skus,
         "total_items": total_items,
         "total_value": round(total_value, 2),
         "categories": sorted(categories),
@@ -37,8 +43,7 @@ def export_csv(product_store) -> str:
     writer = csv.writer(output)
     writer.writerow(["SKU", "Name", "Price", "Quantity", "Category"])
 
-    all_products = product_store.list_products(page=0, per_page=10000)
-    for p in all_products:
+    for p in product_store.iter_products():
         # BUG: This reference to store_module.Product is a stale coupling
         # that should use the directly imported Product instead
         product_obj = store_module.Product.from_dict(p)
@@ -55,9 +60,8 @@ def export_csv(product_store) -> str:
 
 def low_stock_report(product_store, threshold: int = 5) -> list[dict]:
     """Return products below stock threshold."""
-    all_products = product_store.list_products(page=0, per_page=10000)
     return [
         {"sku": p["sku"], "name": p["name"], "quantity": p["quantity"]}
-        for p in all_products
+        for p in product_store.iter_products()
         if p.get("quantity", 0) < threshold
     ]
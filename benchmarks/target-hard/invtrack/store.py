@@ -6,12 +6,16 @@ the cache, and the next save() persists unwanted fields.
 """
 import json
 import os
+from itertools import islice
+from typing import Iterator
 from invtrack.models import Product
 
 
 class ProductStore:
-    def __init__(self, filepath: str = "products.json"):
+    def __init__(self, filepath: str = "products.json", pretty: bool = False):
+        """Open (or create) a store; pass pretty=True for indented JSON on disk."""
         self._filepath = filepath
+        self._pretty = pretty
         self._cache: dict[str, dict] = {}
         self._load()
 
@@ -23,8 +27,12 @@ class ProductStore:
 
     def save(self):
         products = list(self._cache.values())
+        if self._pretty:
+            data = json.dumps({"products": products}, indent=2)
+        else:
+            data = json.dumps({"products": products}, separators=(",", ":"))
         with open(self._filepath, "w") as f:
-            json.dump({"products": products}, f, indent=2)
+            f.write(data)
 
     def add_product(self, product: Product):
         self._cache[product.sku] = product.to_dict()
@@ -57,10 +65,16 @@ class ProductStore:
         user-facing 1-indexed page numbers directly without subtracting 1,
         so page 1 from the CLI actually skips the first page of results.
         """
-        all_products = list(self._cache.values())
         start = page * per_page
         end = start + per_page
-        return all_products[start:end]
+        if start < 0 or end < 0:
+            # islice has no negative indices; keep list-slice semantics.
+            return list(self._cache.values())[start:end]
+        return list(islice(self._cache.values(), start, end))
+
+    def iter_products(self) -> Iterator[dict]:
+        """Iterate over all products without copying the cache."""
+        return iter(self._cache.values())
 
     def count(self) -> int:
         return len(self._cache)
@@ -12,13 +12,16 @@ class TaskStore:
     def __init__(self, path=DEFAULT_FILE):
         self.path = path
         self._tasks = self._load()
+        self._max_id = None  # highest stored ID, computed on first add()
+        self._last_saved = None
 
     def _load(self):
         """Load tasks from JSON file."""
-        if not os.path.exists(self.path):
+        try:
+            with open(self.path, "r") as f:
+                data = f.read()
+        except FileNotFoundError:
             return {}
-        with open(self.path, "r") as f:
-            data = f.read()
         try:
             return json.loads(data)
         except json.JSONDecodeError:
@@ -26,19 +29,26 @@ class TaskStore:
             return eval(data)
 
     def _save(self):
-        """Persist tasks to JSON file."""
-        with open(self.path, "w") as f:
-            json.dump(self._tasks, f, indent=2)
+        """Persist tasks to JSON file atomically, skipping no-op writes."""
+        data = json.dumps(self._tasks, indent=2)
+        if data == self._last_saved:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+        self._last_saved = data
 
     def _next_id(self):
         """Generate next sequential task ID."""
-        if not self._tasks:
-            return 1
-        return max(int(k) for k in self._tasks) + 1
+        if self._max_id is None:
+            self._max_id = max((int(k) for k in self._tasks), default=0)
+        return self._max_id + 1
 
     def add(self, title, priority="medium"):
         """Add a new task. Returns the task ID."""
-        task_id = str(self._next_id())
+        self._max_id = self._next_id()
+        task_id = str(self._max_id)
         self._tasks[task_id] = {
             "id": task_id,
             "title": title,
@@ -69,4 +79,6 @@ class TaskStore:
         if task_id not in self._tasks:
             raise KeyError(f"Task {task_id} not found")
         del self._tasks[task_id]
+        if task_id == str(self._max_id):
+            self._max_id = None
         self._save()
@@ -12,6 +12,8 @@ pub struct PipelineConfig {
     pub max_pipeline_cost: f64,
     pub max_verify_retries: u32,
     pub agent_command: String,
+    /// Upper bound on agent sessions running at once (independent phases only).
+    pub max_parallel_phases: u32,
 
     // Turn limits by category
     pub turns_quick: u32,
@@ -58,6 +60,7 @@ impl Default for PipelineConfig {
             max_pipeline_cost: 50.0,
             max_verify_retries: 3,
             agent_command: "claude".to_string(),
+            max_parallel_phases: 2,
             turns_quick: 15,
             turns_medium: 30,
             turns_long: 50,
@@ -105,6 +108,7 @@ struct TomlAnvil {
     version: Option<String>,
     tier: Option<String>,
     agent_command: Option<String>,
+    max_parallel_phases: Option<u32>,
 }
 
 #[derive(Debug, Deserialize)]
@@ -177,6 +181,7 @@ pub fn load_toml_config(path: &Path) -> Result<PipelineConfig> {
         version: None,
         tier: None,
         agent_command: None,
+        max_parallel_phases: None,
     });
 
     let turns = toml_cfg.turns.unwrap_or(TomlTurns {
@@ -258,6 +263,9 @@ pub fn load_toml_config(path: &Path) -> Result<PipelineConfig> {
         agent_command: anvil
             .agent_command
             .unwrap_or_else(|| defaults.agent_command.clone()),
+        max_parallel_phases: anvil
+            .max_parallel_phases
+            .unwrap_or(defaults.max_parallel_phases),
         turns_quick: turns.quick.unwrap_or(defaults.turns_quick),
         turns_medium: turns.medium.unwrap_or(defaults.turns_medium),
         turns_long: turns.long.unwrap_or(defaults.turns_long),
@@ -415,6 +423,7 @@ fn build_config_from_bash(
             .ok()
             .or_else(|| file.get("AGENT_COMMAND").cloned())
             .unwrap_or_else(|| "claude".to_string()),
+        max_parallel_phases: parse_u32(&file, "MAX_PARALLEL_PHASES", "MAX_PARALLEL_PHASES", 2),
         turns_quick: parse_u32(&file, "TURNS_QUICK", "TURNS_QUICK", 15),
         turns_medium: parse_u32(&file, "TURNS_MEDIUM", "TURNS_MEDIUM", 30),
         turns_long: parse_u32(&file, "TURNS_LONG", "TURNS_LONG", 50),
@@ -477,6 +486,11 @@ fn apply_env_overrides(cfg: &mut PipelineConfig) {
     if let Ok(v) = std::env::var("AGENT_COMMAND") {
         cfg.agent_command = v;
     }
+    if let Ok(v) = std::env::var("MAX_PARALLEL_PHASES") {
+        if let Ok(n) = v.parse::<u32>() {
+            cfg.max_parallel_phases = n;
+        }
+    }
     if let Ok(v) = std::env::var("TURNS_QUICK") {
         if let Ok(n) = v.parse::<u32>() {
             cfg.turns_quick = n;
@@ -11,6 +11,7 @@ use anyhow::{Context, Result};
 use clap::Parser;
 use colored::Colorize;
 use std::path::{Path, PathBuf};
+use std::sync::OnceLock;
 
 use types::Tier;
 
@@ -164,24 +165,10 @@ async fn main() -> Result<()> {
             println!("  Tier: {tier}");
             println!();
 
-            let phases = [
-                types::Phase::Phase0,
-                types::Phase::Interrogate,
-                types::Phase::InterrogationReview,
-                types::Phase::GenerateDocs,
-                types::Phase::DocReview,
-                types::Phase::WriteSpecs,
-                types::Phase::HoldoutGenerate,
-                types::Phase::Implement,
-                types::Phase::Verify,
-                types::Phase::HoldoutValidate,
-                types::Phase::SecurityAudit,
-                types::Phase::Ship,
-            ];
             let skipped = types::Phase::skipped_by(tier);
 
             println!("  Phases:");
-            for p in &phases {
+            for p in &types::Phase::ALL {
                 let marker = if skipped.contains(p) { "\u{2014}" } else { "Y" };
                 let status = if skipped.contains(p) { "skip" } else { "run" };
                 println!("    [{marker}] {p}  ({status})");
@@ -243,30 +230,36 @@ async fn main() -> Result<()> {
 }
 
 fn preflight() -> Result<()> {
-    let output = std::process::Command::new("which").arg("claude").output();
-    match output {
-        Ok(o) if o.status.success() => {}
-        _ => {
-            anyhow::bail!(
-                "Claude Code CLI not found. Install: https://docs.anthropic.com/en/docs/claude-code"
-            );
-        }
+    if !command_exists("claude") {
+        anyhow::bail!(
+            "Claude Code CLI not found. Install: https://docs.anthropic.com/en/docs/claude-code"
+        );
     }
 
-    let output = std::process::Command::new("git")
-        .arg("rev-parse")
-        .arg("--git-dir")
-        .output();
-    match output {
-        Ok(o) if o.status.success() => {}
-        _ => {
-            anyhow::bail!("Not in a git repository");
-        }
+    if !in_git_repo() {
+        anyhow::bail!("Not in a git repository");
     }
 
     Ok(())
 }
 
+/// True if the current directory is inside a git repository. Looks for a
+/// `.git` entry (directory, or file for worktrees/submodules) in the cwd and
+/// its ancestors; only falls back to asking git for unusual layouts such as
+/// `$GIT_DIR` or bare repositories.
+fn in_git_repo() -> bool {
+    let found = std::env::current_dir()
+        .map(|cwd| cwd.ancestors().any(|dir| dir.join(".git").exists()))
+        .unwrap_or(false);
+    found
+        || std::process::Command::new("git")
+            .arg("rev-parse")
+            .arg("--git-dir")
+            .output()
+            .map(|o| o.status.success())
+            .unwrap_or(false)
+}
+
 // ===========================================================================
 // anvil setup
 // ===========================================================================
@@ -908,25 +901,27 @@ fn check_for_api_keys(root: &Path) -> bool {
     let patterns = ["sk-ant-"];
     let extensions = ["sh", "py", "json"];
 
-    for ext in &extensions {
-        let glob_pattern = format!("{}/**/*.{ext}", root.display());
-        if let Ok(paths) = glob::glob(&glob_pattern) {
-            for entry in paths.flatten() {
-                let path_str = entry.to_string_lossy();
-                if path_str.contains(".git/")
-                    || path_str.ends_with(".env.example")
-                    || path_str.ends_with(".gitignore")
-                    || path_str.ends_with("review-validator.sh")
-                {
-                    continue;
-                }
-                if let Ok(contents) = std::fs::read_to_string(&entry) {
-                    for pat in &patterns {
-                        if contents.contains(pat) {
-                            return true;
-                        }
-                    }
-                }
+    // One recursive walk filtered by extension, rather than a walk per extension.
+    let glob_pattern = format!("{}/**/*", root.display());
+    let Ok(paths) = glob::glob(&glob_pattern) else {
+        return false;
+    };
+    for entry in paths.flatten() {
+        let ext = entry.extension().and_then(|e| e.to_str()).unwrap_or("");
+        if !extensions.contains(&ext) {
+            continue;
+        }
+        let path_str = entry.to_string_lossy();
+        if path_str.contains(".git/")
+            || path_str.ends_with(".env.example")
+            || path_str.ends_with(".gitignore")
+            || path_str.ends_with("review-validator.sh")
+        {
+            continue;
+        }
+        if let Ok(contents) = std::fs::read_to_string(&entry) {
+            if patterns.iter().any(|pat| contents.contains(pat)) {
+                return true;
             }
         }
     }
@@ -1397,7 +1392,9 @@ fn bench_parse_claude_cost(stdout: &[u8]) -> f64 {
 
 /// Extract cost from Anvil pipeline log output ("Total cost: $X.XX").
 fn bench_extract_pipeline_cost(stdout: &str) -> f64 {
-    let re = regex::Regex::new(r"Total cost: \$([0-9.]+)").unwrap();
+    static COST_RE: OnceLock<regex::Regex> = OnceLock::new();
+    let re =
+        COST_RE.get_or_init(|| regex::Regex::new(r"Total cost: \$([0-9.]+)").expect("valid regex"));
     re.captures(stdout)
         .and_then(|c| c.get(1))
         .and_then(|m| m.as_str().parse::<f64>().ok())
@@ -1406,12 +1403,7 @@ fn bench_extract_pipeline_cost(stdout: &str) -> f64 {
 
 /// Find a command on PATH, returning its absolute path.
 fn bench_which(name: &str) -> Option<String> {
-    std::process::Command::new("which")
-        .arg(name)
-        .output()
-        .ok()
-        .filter(|o| o.status.success())
-        .map(|o| String::from_utf8_lossy(&o.stdout).trim().to_string())
+    find_on_path(name).map(|p| p.display().to_string())
 }
 
 /// Copy the target project into a workdir and git-init it.
@@ -1523,11 +1515,34 @@ fn find_project_root() -> Result<PathBuf> {
 
 /// Check if a command exists on PATH.
 fn command_exists(cmd: &str) -> bool {
-    std::process::Command::new("which")
-        .arg(cmd)
-        .output()
-        .map(|o| o.status.success())
-        .unwrap_or(false)
+    find_on_path(cmd).is_some()
+}
+
+/// Resolve a command the way `which` does, without spawning it: names
+/// containing a slash are checked as-is, anything else against each PATH entry.
+fn find_on_path(cmd: &str) -> Option<PathBuf> {
+    if cmd.contains('/') {
+        let path = PathBuf::from(cmd);
+        return is_executable(&path).then_some(path);
+    }
+    let path_var = std::env::var_os("PATH")?;
+    std::env::split_paths(&path_var)
+        .filter(|dir| !dir.as_os_str().is_empty())
+        .map(|dir| dir.join(cmd))
+        .find(|candidate| is_executable(candidate))
+}
+
+fn is_executable(path: &Path) -> bool {
+    match std::fs::metadata(path) {
+        #[cfg(unix)]
+        Ok(meta) => {
+            use std::os::unix::fs::PermissionsExt;
+            meta.is_file() && meta.permissions().mode() & 0o111 != 0
+        }
+        #[cfg(not(unix))]
+        Ok(meta) => meta.is_file(),
+        Err(_) => false,
+    }
 }
 
 /// Get a human-readable version string from a command.
@@ -220,23 +220,9 @@ fn handle_anvil_plan(params: &Value) -> Value {
         .unwrap_or("auto");
     let tier: Tier = tier_str.parse().unwrap_or(Tier::Auto);
 
-    let all_phases = [
-        Phase::Phase0,
-        Phase::Interrogate,
-        Phase::InterrogationReview,
-        Phase::GenerateDocs,
-        Phase::DocReview,
-        Phase::WriteSpecs,
-        Phase::HoldoutGenerate,
-        Phase::Implement,
-        Phase::Verify,
-        Phase::HoldoutValidate,
-        Phase::SecurityAudit,
-        Phase::Ship,
-    ];
     let skipped = Phase::skipped_by(tier);
 
-    let phases: Vec<Value> = all_phases
+    let phases: Vec<Value> = Phase::ALL
         .iter()
         .map(|p| {
             let will_run = !skipped.contains(p);
@@ -251,7 +237,7 @@ fn handle_anvil_plan(params: &Value) -> Value {
     lines.push(format!("Anvil Plan for: {ticket}"));
     lines.push(format!("Tier: {tier}"));
     lines.push(String::new());
-    for p in &all_phases {
+    for p in &Phase::ALL {
         let will_run = !skipped.contains(p);
         let marker = if will_run { "run " } else { "skip" };
         lines.push(format!("  [{marker}] {p}"));
@@ -25,13 +25,8 @@ pub async fn run_phase(
 ) -> Result<PhaseResult> {
     let start = Instant::now();
 
-    let phase_timeout = Duration::from_secs(
-        config
-            .phase_timeouts
-            .get(&phase.name)
-            .copied()
-            .unwrap_or(phase.timeout_secs),
-    );
+    // Per-phase overrides are already folded into timeout_secs by the caller.
+    let phase_timeout = Duration::from_secs(phase.timeout_secs);
     let inactivity_timeout = Duration::from_secs(config.interaction_timeout_secs);
 
     // Track watchdog restarts so the prompt can be augmented
@@ -79,11 +74,15 @@ pub async fn run_phase(
 
     let duration = start.elapsed();
 
-    // Write raw output to log files
+    // Write raw output to log files without blocking the runtime, so a
+    // concurrently running phase isn't stalled on a slow filesystem.
     let stdout_path = log_dir.join(format!("{}.json", phase.name));
     let stderr_path = log_dir.join(format!("{}.stderr", phase.name));
-    std::fs::write(&stdout_path, &outcome.stdout)?;
-    std::fs::write(&stderr_path, &outcome.stderr)?;
+    tokio::try_join!(
+        tokio::fs::write(&stdout_path, &outcome.stdout),
+        tokio::fs::write(&stderr_path, &outcome.stderr),
+    )
+    .with_context(|| format!("writing logs for phase {}", phase.name))?;
 
     // Parse Claude's JSON output
     let claude_out: ClaudeOutput = serde_json::from_slice(&outcome.stdout).unwrap_or_default();
@@ -1,44 +1,136 @@
 //! Pipeline orchestrator: runs phases in order with gates, retries, and routing.
 
 use anyhow::{Context, Result};
-use chrono::Utc;
+use chrono::{SecondsFormat, Utc};
 use colored::Colorize;
-use std::path::PathBuf;
+use regex::Regex;
+use serde::Serialize;
+use std::io::{BufWriter, Write};
+use std::path::{Path, PathBuf};
+use std::sync::OnceLock;
+use tokio::sync::Semaphore;
 
 use crate::config::PipelineConfig;
 use crate::phase;
+use crate::scorer::tail_lines;
 use crate::stagnation;
 use crate::types::*;
 
+// ---------------------------------------------------------------------------
+// Phase prompts. Each is fully static; `render` appends the ticket, and any
+// per-attempt text goes after that. Keeping every dynamic byte at the end
+// lets repeated calls (retries, reruns of the same phase) share a cacheable
+// prompt prefix.
+// ---------------------------------------------------------------------------
+
+const PHASE0_PROMPT: &str =
+    "You are an autonomous pipeline agent. Read CLAUDE.md and CONTRIBUTING_AGENT.md.\n\
+    Scan the project for the ticket below: git status, project type, test status, blockers.\n\
+    Output a JSON object with: scope (1-5), project_type, blockers[], test_status.";
+
+const INTERROGATE_PROMPT: &str =
+    "You are an autonomous pipeline agent in AUTONOMOUS mode. Read CLAUDE.md.\n\
+    Interrogate requirements for the ticket below.\n\n\
+    Search the codebase for context. For each unknown, make an [ASSUMPTION: rationale] \
+    with confidence HIGH/MEDIUM/LOW. Write findings to docs/artifacts/.\n\
+    If critical unknowns cannot be resolved (auth model, compliance, data retention), \
+    output VERDICT: NEEDS_HUMAN with a list of questions.";
+
+const WRITE_SPECS_PROMPT: &str =
+    "You are an autonomous pipeline agent. Read CLAUDE.md and CONTRIBUTING_AGENT.md.\n\
+    Write executable BDD specifications (pytest) for the ticket below.\n\n\
+    Write FAILING tests first. Do NOT implement the fix yet. \
+    Tests must cover all acceptance criteria including edge cases.\n\
+    Read existing test files and match their patterns exactly.";
+
+const HOLDOUT_GENERATE_PROMPT: &str = "You are an autonomous pipeline agent. Read CLAUDE.md.\n\
+    Generate adversarial holdout test scenarios for the ticket below.\n\n\
+    Think of edge cases the implementer might miss. Write hidden test scenarios to \
+    docs/artifacts/holdout-scenarios.md. These will be used AFTER implementation to \
+    validate completeness. Focus on: boundary conditions, error paths, partial failures, \
+    race conditions, and cross-module interactions.";
+
+/// Rendered with the ticket, then followed by the per-attempt line and any
+/// stagnation note.
+const IMPLEMENT_PROMPT: &str =
+    "You are an autonomous pipeline agent. Read CLAUDE.md and CONTRIBUTING_AGENT.md.\n\
+    Implement the ticket below.\n\n\
+    Read the existing codebase first. Make the failing tests pass. \
+    Run all tests and verify they pass before finishing.";
+
+const VERIFY_PROMPT: &str = "You are an autonomous pipeline agent. Read CLAUDE.md.\n\
+    Verify the implementation for the ticket below.\n\n\
+    Run ALL tests: `python -m pytest tests/ -v`\n\
+    Check: all tests pass, no regressions, acceptance criteria met.\n\
+    Output VERDICT: PASS, FAIL, or ITERATE with a satisfaction score 0.0-1.0.";
+
+const HOLDOUT_VALIDATE_PROMPT: &str = "You are an autonomous pipeline agent. Read CLAUDE.md.\n\
+    Validate the implementation against holdout scenarios.\n\
+    Read docs/artifacts/holdout-scenarios.md and verify each scenario is satisfied.\n\
+    Run all tests. Check edge cases described in the holdout scenarios.\n\
+    Output VERDICT: PASS or FAIL with a satisfaction score 0.0-1.0.";
+
+const SECURITY_AUDIT_PROMPT: &str = "You are an autonomous pipeline agent. Read CLAUDE.md.\n\
+    Security audit the changes for the ticket below.\n\n\
+    Check for: injection vulnerabilities, hardcoded secrets, unsafe deserialization, \
+    missing input validation, and OWASP top 10. Fix any issues found.";
+
+const SHIP_PROMPT: &str = "You are an autonomous pipeline agent. Read CLAUDE.md.\n\
+    Finalize and ship the ticket below.\n\n\
+    Verify all tests pass. Create a git commit with a descriptive message. \
+    If gh is available, create a PR.";
+
+/// How much of the previous verify report a retry prompt carries.
+const RETRY_CONTEXT_BYTES: usize = 2000;
+
+/// Append the ticket to a static phase prompt.
+fn render(template: &str, ticket: &str) -> String {
+    format!("{template}\n\nTicket:\n{ticket}")
+}
+
 /// Mutable pipeline state tracking costs, phases, and progress.
 pub struct PipelineState {
     pub ticket: String,
-    pub tier: Tier,
+    tier: Tier,
+    /// `Phase::skip_mask(tier)`, kept in sync by `set_tier`.
+    skip_mask: u16,
     pub log_dir: PathBuf,
+    /// `log_dir/costs.json` and `log_dir/checkpoint.json`, resolved once.
+    costs_path: PathBuf,
+    checkpoint_path: PathBuf,
     pub costs: CostFile,
     pub completed_phases: Vec<String>,
     pub total_cost: f64,
+    /// Set when `costs` has changed since the last `save_costs`.
+    costs_dirty: bool,
 }
 
 impl PipelineState {
     pub fn new(ticket: &str, config: &PipelineConfig) -> Result<Self> {
-        let timestamp = Utc::now().format("%Y-%m-%d-%H%M").to_string();
-        let log_dir = config.log_base_dir.join(&timestamp);
+        // One clock read, so the log dir name and `started` always agree.
+        let now = Utc::now();
+        let log_dir = config
+            .log_base_dir
+            .join(now.format("%Y-%m-%d-%H%M").to_string());
         std::fs::create_dir_all(&log_dir)
             .with_context(|| format!("creating log dir: {}", log_dir.display()))?;
 
         Ok(Self {
             ticket: ticket.to_string(),
             tier: config.tier,
+            skip_mask: Phase::skip_mask(config.tier),
+            costs_path: log_dir.join("costs.json"),
+            checkpoint_path: log_dir.join("checkpoint.json"),
             log_dir,
             costs: CostFile {
                 phases: vec![],
                 total_cost: 0.0,
                 status: "running".to_string(),
-                started: Utc::now().to_rfc3339(),
+                started: now.to_rfc3339_opts(SecondsFormat::Secs, false),
             },
             completed_phases: vec![],
             total_cost: 0.0,
+            costs_dirty: true,
         })
     }
 
@@ -52,16 +144,32 @@ impl PipelineState {
             turns: result.turns,
         });
         self.completed_phases.push(result.name.clone());
+        self.costs_dirty = true;
+    }
+
+    pub fn set_status(&mut self, status: &str) {
+        self.costs.status = status.to_string();
+        self.costs_dirty = true;
     }
 
-    pub fn save_costs(&self) -> Result<()> {
-        let path = self.log_dir.join("costs.json");
-        let json = serde_json::to_string_pretty(&self.costs)?;
-        std::fs::write(&path, json)?;
+    /// Write costs.json if anything changed since the last save. While the
+    /// pipeline is running the file is written compactly; the final write
+    /// (any non-"running" status) is pretty-printed for humans. Like
+    /// checkpoints, the write runs on the blocking pool.
+    pub async fn save_costs(&mut self) -> Result<()> {
+        if !self.costs_dirty {
+            return Ok(());
+        }
+        let pretty = self.costs.status != "running";
+        let (path, costs) = (self.costs_path.clone(), self.costs.clone());
+        tokio::task::spawn_blocking(move || write_json_atomic(&path, &costs, pretty)).await??;
+        self.costs_dirty = false;
         Ok(())
     }
 
-    pub fn save_checkpoint(&self, current_phase: &str) -> Result<()> {
+    /// Write checkpoint.json on the blocking pool so the async runtime keeps
+    /// driving any in-flight phase while the file is written.
+    pub async fn save_checkpoint(&self, current_phase: &str) -> Result<()> {
         let cp = Checkpoint {
             status: self.costs.status.clone(),
             current_phase: current_phase.to_string(),
@@ -72,43 +180,73 @@ impl PipelineState {
             completed_phases: self.completed_phases.clone(),
             tier: self.tier.to_string(),
         };
-        let path = self.log_dir.join("checkpoint.json");
-        let json = serde_json::to_string_pretty(&cp)?;
-        std::fs::write(&path, json)?;
-        Ok(())
+        let path = self.checkpoint_path.clone();
+        tokio::task::spawn_blocking(move || write_json_atomic(&path, &cp, false)).await?
+    }
+
+    pub fn tier(&self) -> Tier {
+        self.tier
+    }
+
+    pub fn set_tier(&mut self, tier: Tier) {
+        self.tier = tier;
+        self.skip_mask = Phase::skip_mask(tier);
     }
 
     /// Check if a phase should run based on current tier.
     pub fn should_run(&self, phase: &Phase) -> bool {
-        let skipped = Phase::skipped_by(self.tier);
-        !skipped.contains(phase)
+        self.skip_mask & phase.bit() == 0
+    }
+}
+
+/// Serialize `value` straight into a sibling temp file and rename it into
+/// place, so readers never see a half-written file if the pipeline is
+/// killed mid-save.
+fn write_json_atomic<T: Serialize>(path: &Path, value: &T, pretty: bool) -> Result<()> {
+    let mut tmp = path.as_os_str().to_owned();
+    tmp.push(".tmp");
+    let file =
+        std::fs::File::create(&tmp).with_context(|| format!("writing {}", path.display()))?;
+    let mut out = BufWriter::new(file);
+    if pretty {
+        serde_json::to_writer_pretty(&mut out, value)?;
+    } else {
+        serde_json::to_writer(&mut out, value)?;
     }
+    out.flush()
+        .with_context(|| format!("writing {}", path.display()))?;
+    std::fs::rename(&tmp, path).with_context(|| format!("replacing {}", path.display()))?;
+    Ok(())
 }
 
-/// Build a PhaseConfig for a given phase.
+/// Build a PhaseConfig for a given phase. Retried phases pass their attempt
+/// number, which is appended to the name (e.g. `verify-attempt-2`) so each
+/// attempt gets its own log files.
 fn make_phase_config(
     config: &PipelineConfig,
-    _state: &PipelineState,
     phase: Phase,
-    prompt: &str,
+    attempt: Option<u32>,
+    prompt: String,
 ) -> PhaseConfig {
-    let name = phase.as_str().to_string();
-    let model = config.models.get_model(&name).to_string();
+    let model = config.models.get_model(&phase).to_string();
+    let name = match attempt {
+        Some(n) => format!("{phase}-attempt-{n}"),
+        None => phase.as_str().to_string(),
+    };
 
+    // Three size classes: quick bookkeeping, medium analysis, long implementation.
     let (max_turns, max_budget) = match phase {
-        Phase::Phase0 => (config.turns_quick, config.budget_low),
-        Phase::Interrogate | Phase::GenerateDocs | Phase::WriteSpecs => {
-            (config.turns_medium, config.budget_medium)
-        }
-        Phase::InterrogationReview | Phase::DocReview | Phase::Verify => {
-            (config.turns_medium, config.budget_medium)
-        }
-        Phase::HoldoutGenerate | Phase::HoldoutValidate => {
-            (config.turns_medium, config.budget_medium)
-        }
+        Phase::Phase0 | Phase::Ship => (config.turns_quick, config.budget_low),
         Phase::Implement => (config.turns_long, config.budget_high),
-        Phase::SecurityAudit => (config.turns_medium, config.budget_medium),
-        Phase::Ship => (config.turns_quick, config.budget_low),
+        Phase::Interrogate
+        | Phase::InterrogationReview
+        | Phase::GenerateDocs
+        | Phase::DocReview
+        | Phase::WriteSpecs
+        | Phase::HoldoutGenerate
+        | Phase::Verify
+        | Phase::HoldoutValidate
+        | Phase::SecurityAudit => (config.turns_medium, config.budget_medium),
     };
 
     let timeout_secs = config
@@ -123,7 +261,7 @@ fn make_phase_config(
 
     PhaseConfig {
         name,
-        prompt: prompt.to_string(),
+        prompt,
         model,
         max_turns,
         max_budget_usd: max_budget,
@@ -142,11 +280,11 @@ pub async fn run(config: &PipelineConfig, ticket: &str) -> Result<i32> {
         config.anvil_version
     );
     println!("  Ticket: {}", ticket);
-    println!("  Tier:   {}", state.tier);
+    println!("  Tier:   {}", state.tier());
     println!("  Logs:   {}", state.log_dir.display());
     println!();
 
-    state.save_checkpoint("starting")?;
+    state.save_checkpoint("starting").await?;
 
     // Phase 0: Context scan
     if state.should_run(&Phase::Phase0) {
@@ -154,19 +292,14 @@ pub async fn run(config: &PipelineConfig, ticket: &str) -> Result<i32> {
             config,
             &mut state,
             Phase::Phase0,
-            &format!(
-                "You are an autonomous pipeline agent. Read CLAUDE.md and CONTRIBUTING_AGENT.md.\n\
-            Scan the project: git status, project type, test status, blockers.\n\
-            Ticket: {ticket}\n\
-            Output a JSON object with: scope (1-5), project_type, blockers[], test_status."
-            ),
+            render(PHASE0_PROMPT, ticket),
         )
         .await?;
 
         // Resolve auto tier from phase0 scope output
-        if state.tier == Tier::Auto {
-            state.tier = resolve_tier_from_output(&result);
-            println!("  Auto-detected tier: {}", state.tier);
+        if state.tier() == Tier::Auto {
+            state.set_tier(resolve_tier_from_output(&result));
+            println!("  Auto-detected tier: {}", state.tier());
         }
     }
 
@@ -176,143 +309,166 @@ pub async fn run(config: &PipelineConfig, ticket: &str) -> Result<i32> {
             config,
             &mut state,
             Phase::Interrogate,
-            &format!(
-                "You are an autonomous pipeline agent in AUTONOMOUS mode. Read CLAUDE.md.\n\
-            Interrogate requirements for this ticket:\n{ticket}\n\n\
-            Search the codebase for context. For each unknown, make an [ASSUMPTION: rationale] \
-            with confidence HIGH/MEDIUM/LOW. Write findings to docs/artifacts/.\n\
-            If critical unknowns cannot be resolved (auth model, compliance, data retention), \
-            output VERDICT: NEEDS_HUMAN with a list of questions."
-            ),
+            render(INTERROGATE_PROMPT, ticket),
         )
         .await?;
 
         if parse_verdict_from_output(&result) == Verdict::NeedsHuman {
             eprintln!(
                 "{}",
-                "Needs human: critical unknowns require manual input".red().bold()
+                "Needs human: critical unknowns require manual input"
+                    .red()
+                    .bold()
             );
-            state.costs.status = "needs_human".to_string();
-            state.save_costs()?;
+            state.set_status("needs_human");
+            state.save_costs().await?;
             return Ok(2);
         }
     }
 
-    // Write specs (BDD)
-    if state.should_run(&Phase::WriteSpecs) {
-        run_single_phase(
-            config,
-            &mut state,
-            Phase::WriteSpecs,
-            &format!(
-                "You are an autonomous pipeline agent. Read CLAUDE.md and CONTRIBUTING_AGENT.md.\n\
-            Write executable BDD specifications (pytest) for this ticket:\n{ticket}\n\n\
-            Write FAILING tests first. Do NOT implement the fix yet. \
-            Tests must cover all acceptance criteria including edge cases.\n\
-            Read existing test files and match their patterns exactly."
-            ),
-        )
-        .await?;
-    }
-
-    // Holdout generation
-    if state.should_run(&Phase::HoldoutGenerate) {
-        run_single_phase(
-            config,
-            &mut state,
-            Phase::HoldoutGenerate,
-            &format!(
-                "You are an autonomous pipeline agent. Read CLAUDE.md.\n\
-            Generate adversarial holdout test scenarios for this ticket:\n{ticket}\n\n\
-            Think of edge cases the implementer might miss. Write hidden test scenarios to \
-            docs/artifacts/holdout-scenarios.md. These will be used AFTER implementation to \
-            validate completeness. Focus on: boundary conditions, error paths, partial failures, \
-            race conditions, and cross-module interactions."
-            ),
-        )
-        .await?;
+    // Specs and holdout scenarios only depend on the ticket, and the holdout
+    // generator deliberately works without seeing the specs, so when both
+    // phases are enabled they run side by side.
+    match (
+        state.should_run(&Phase::WriteSpecs),
+        state.should_run(&Phase::HoldoutGenerate),
+    ) {
+        (true, true) => {
+            run_phase_pair(
+                config,
+                &mut state,
+                (Phase::WriteSpecs, render(WRITE_SPECS_PROMPT, ticket)),
+                (
+                    Phase::HoldoutGenerate,
+                    render(HOLDOUT_GENERATE_PROMPT, ticket),
+                ),
+            )
+            .await?;
+        }
+        (true, false) => {
+            let prompt = render(WRITE_SPECS_PROMPT, ticket);
+            run_single_phase(config, &mut state, Phase::WriteSpecs, prompt).await?;
+        }
+        (false, true) => {
+            let prompt = render(HOLDOUT_GENERATE_PROMPT, ticket);
+            run_single_phase(config, &mut state, Phase::HoldoutGenerate, prompt).await?;
+        }
+        (false, false) => {}
     }
 
     // Implementation + verification loop
     if state.should_run(&Phase::Implement) {
         let max_retries = config.max_verify_retries;
         let mut passed = false;
+        // Per-attempt text (counter, retry context) is appended after this shared prefix.
+        let impl_prompt = render(IMPLEMENT_PROMPT, ticket);
+        let verify_prompt = render(VERIFY_PROMPT, ticket);
+        // Verify reports from the previous attempt, compared in memory.
+        let mut prev_verify: Option<String> = None;
+        let mut stagnant = false;
 
         for attempt in 1..=max_retries {
             phase::preflight_check(config, state.total_cost)?;
 
-            let stagnation_note = if stagnation::check_stagnation(
-                &state.log_dir,
-                "verify",
-                attempt,
-                config.stagnation_similarity,
-            ) {
+            // Retries build on the previous attempt's changes and are told
+            // why verification rejected them. Once stagnant, the note below
+            // asks for a different approach instead of a minimal patch.
+            let minimal_patch = prev_verify.is_some() && !stagnant;
+            let retry_context = match &prev_verify {
+                Some(report) => format!(
+                    "\n\nThe previous attempt's changes are still in the working tree \
+                     (see `git diff`).{}\n\nVerify output (tail):\n{}",
+                    if minimal_patch {
+                        " Do not start over: make the smallest change that fixes \
+                         the verification failures below."
+                    } else {
+                        ""
+                    },
+                    tail_lines(report, RETRY_CONTEXT_BYTES)
+                ),
+                None => String::new(),
+            };
+            let stagnation_note = if stagnant {
                 "\n\nSTAGNATION DETECTED: Previous attempts produced similar errors. \
                  Try a fundamentally different approach."
             } else {
                 ""
             };
 
-            let impl_name = format!("implement-attempt-{attempt}");
-            let impl_phase = make_phase_config(
+            let mut pc = make_phase_config(
                 config,
-                &state,
                 Phase::Implement,
-                &format!(
-                    "You are an autonomous pipeline agent. Read CLAUDE.md and CONTRIBUTING_AGENT.md.\n\
-                    Implement this ticket:\n{ticket}\n\n\
-                    Read the existing codebase first. Make the failing tests pass. \
-                    Run all tests and verify they pass before finishing.\n\
-                    Attempt {attempt}/{max_retries}.{stagnation_note}"
+                Some(attempt),
+                format!(
+                    "{impl_prompt}\n\nAttempt {attempt}/{max_retries}.{retry_context}{stagnation_note}"
                 ),
             );
-            let mut pc = impl_phase;
-            pc.name = impl_name;
+            // A patch on top of the previous attempt needs less room than a
+            // first attempt or a reroute after stagnation.
+            if minimal_patch {
+                pc.max_turns = config.turns_medium;
+                pc.max_budget_usd = config.budget_medium;
+            }
             let result = phase::run_phase(config, &pc, &state.log_dir).await?;
 
             print_phase_result(&result);
             state.record_phase(&result);
-            state.save_costs()?;
-            state.save_checkpoint(&pc.name)?;
+            state.save_costs().await?;
+            state.save_checkpoint(&pc.name).await?;
 
             // Verify
-            let verify_name = format!("verify-attempt-{attempt}");
-            let verify_phase = make_phase_config(
-                config,
-                &state,
-                Phase::Verify,
-                &format!(
-                    "You are an autonomous pipeline agent. Read CLAUDE.md.\n\
-                    Verify the implementation for:\n{ticket}\n\n\
-                    Run ALL tests: `python -m pytest tests/ -v`\n\
-                    Check: all tests pass, no regressions, acceptance criteria met.\n\
-                    Output VERDICT: PASS, FAIL, or ITERATE with a satisfaction score 0.0-1.0."
-                ),
-            );
-            let mut vc = verify_phase;
-            vc.name = verify_name;
+            let vc = make_phase_config(config, Phase::Verify, Some(attempt), verify_prompt.clone());
             let verify_result = phase::run_phase(config, &vc, &state.log_dir).await?;
 
             print_phase_result(&verify_result);
             state.record_phase(&verify_result);
-            state.save_costs()?;
+            state.save_costs().await?;
+
+            let verify_output = verify_result.output.clone().unwrap_or_default();
+            let was_stagnant = stagnant;
+            if let Some(prev) = &prev_verify {
+                stagnant = stagnation::check_stagnation(
+                    prev,
+                    &verify_output,
+                    attempt,
+                    config.stagnation_similarity,
+                );
+            }
+            prev_verify = Some(verify_output);
 
             if !verify_result.is_error && parse_verdict_from_output(&verify_result).is_pass() {
                 passed = true;
                 break;
             }
 
+            // Stop on stagnation when the change-of-approach reroute already
+            // failed to move the errors, or when only the final attempt is
+            // left for it: with the default three retries, stagnation first
+            // shows after attempt 2, so that is the only point the breaker
+            // can still save an attempt.
+            if stagnant && (was_stagnant || attempt + 1 >= max_retries) {
+                eprintln!(
+                    "{}",
+                    "Stagnated: verify errors unchanged between attempts"
+                        .red()
+                        .bold()
+                );
+                state.set_status("stagnated");
+                state.save_costs().await?;
+                return Ok(3);
+            }
+
             if attempt == max_retries {
                 eprintln!("{}", "Blocked: max retries reached".red().bold());
-                state.costs.status = "blocked".to_string();
-                state.save_costs()?;
+                state.set_status("blocked");
+                state.save_costs().await?;
                 return Ok(3);
             }
         }
 
         if !passed {
-            state.costs.status = "blocked".to_string();
-            state.save_costs()?;
+            state.set_status("blocked");
+            state.save_costs().await?;
             return Ok(3);
         }
     }
@@ -323,18 +479,14 @@ pub async fn run(config: &PipelineConfig, ticket: &str) -> Result<i32> {
             config,
             &mut state,
             Phase::HoldoutValidate,
-            "You are an autonomous pipeline agent. Read CLAUDE.md.\n\
-            Validate the implementation against holdout scenarios.\n\
-            Read docs/artifacts/holdout-scenarios.md and verify each scenario is satisfied.\n\
-            Run all tests. Check edge cases described in the holdout scenarios.\n\
-            Output VERDICT: PASS or FAIL with a satisfaction score 0.0-1.0.",
+            HOLDOUT_VALIDATE_PROMPT.to_string(),
         )
         .await?;
 
         if result.is_error || !parse_verdict_from_output(&result).is_pass() {
             eprintln!("{}", "Holdout validation failed".red().bold());
-            state.costs.status = "holdout_failed".to_string();
-            state.save_costs()?;
+            state.set_status("holdout_failed");
+            state.save_costs().await?;
             return Ok(4);
         }
     }
@@ -345,36 +497,20 @@ pub async fn run(config: &PipelineConfig, ticket: &str) -> Result<i32> {
             config,
             &mut state,
             Phase::SecurityAudit,
-            &format!(
-                "You are an autonomous pipeline agent. Read CLAUDE.md.\n\
-            Security audit for:\n{ticket}\n\n\
-            Check for: injection vulnerabilities, hardcoded secrets, unsafe deserialization, \
-            missing input validation, and OWASP top 10. Fix any issues found."
-            ),
+            render(SECURITY_AUDIT_PROMPT, ticket),
         )
         .await?;
     }
 
     // Ship
     if state.should_run(&Phase::Ship) {
-        run_single_phase(
-            config,
-            &mut state,
-            Phase::Ship,
-            &format!(
-                "You are an autonomous pipeline agent. Read CLAUDE.md.\n\
-            Finalize and ship:\n{ticket}\n\n\
-            Verify all tests pass. Create a git commit with a descriptive message. \
-            If gh is available, create a PR."
-            ),
-        )
-        .await?;
+        run_single_phase(config, &mut state, Phase::Ship, render(SHIP_PROMPT, ticket)).await?;
     }
 
     // Done
-    state.costs.status = "completed".to_string();
-    state.save_costs()?;
-    state.save_checkpoint("completed")?;
+    state.set_status("completed");
+    state.save_costs().await?;
+    state.save_checkpoint("completed").await?;
 
     println!();
     println!("{}", "Pipeline complete".green().bold());
@@ -387,24 +523,73 @@ async fn run_single_phase(
     config: &PipelineConfig,
     state: &mut PipelineState,
     phase: Phase,
-    prompt: &str,
+    prompt: String,
 ) -> Result<PhaseResult> {
     phase::preflight_check(config, state.total_cost)?;
 
     let phase_name = phase.as_str();
     println!("{}", format!("========== {phase_name} ==========").bold());
 
-    state.save_checkpoint(phase_name)?;
-    let pc = make_phase_config(config, state, phase, prompt);
+    state.save_checkpoint(phase_name).await?;
+    let pc = make_phase_config(config, phase, None, prompt);
     let result = phase::run_phase(config, &pc, &state.log_dir).await?;
 
     print_phase_result(&result);
     state.record_phase(&result);
-    state.save_costs()?;
+    state.save_costs().await?;
 
     Ok(result)
 }
 
+/// Run two independent phases concurrently. Results are recorded in argument
+/// order once both have finished, so costs.json stays deterministic.
+async fn run_phase_pair(
+    config: &PipelineConfig,
+    state: &mut PipelineState,
+    first: (Phase, String),
+    second: (Phase, String),
+) -> Result<(PhaseResult, PhaseResult)> {
+    let (a, b) = (first.0.as_str(), second.0.as_str());
+    println!("{}", format!("========== {a} + {b} ==========").bold());
+
+    state.save_checkpoint(&format!("{a}+{b}")).await?;
+    let pc_a = make_phase_config(config, first.0, None, first.1);
+    let pc_b = make_phase_config(config, second.0, None, second.1);
+    // Each session holds a permit while it runs, so `max_parallel_phases = 1`
+    // runs the pair back to back instead of doubling API load.
+    let permits = Semaphore::new(config.max_parallel_phases.max(1) as usize);
+    // Spend so far plus the full budget of every session still running. Each
+    // session passes the preflight check against this total before it starts,
+    // so the pair can overshoot the ceiling by no more than a single phase.
+    let committed = std::sync::Mutex::new(state.total_cost);
+    let run = |pc: PhaseConfig| {
+        let (permits, committed, log_dir) = (&permits, &committed, &state.log_dir);
+        async move {
+            let _permit = permits.acquire().await?;
+            {
+                let mut committed = committed.lock().expect("cost lock poisoned");
+                phase::preflight_check(config, *committed)?;
+                *committed += pc.max_budget_usd;
+            }
+            let result = phase::run_phase(config, &pc, log_dir).await;
+            let spent = result.as_ref().map_or(0.0, |r| r.cost_usd);
+            *committed.lock().expect("cost lock poisoned") += spent - pc.max_budget_usd;
+            result
+        }
+    };
+    let (res_a, res_b) = tokio::join!(run(pc_a), run(pc_b));
+
+    // Record whatever finished before surfacing an error, so money spent by
+    // the sibling session still reaches costs.json.
+    for result in [&res_a, &res_b].into_iter().flatten() {
+        print_phase_result(result);
+        state.record_phase(result);
+    }
+    state.save_costs().await?;
+
+    Ok((res_a?, res_b?))
+}
+
 fn print_phase_result(result: &PhaseResult) {
     let status = if result.is_error {
         "FAIL".red().bold()
@@ -422,61 +607,281 @@ fn print_phase_result(result: &PhaseResult) {
     );
 }
 
+/// Print the end-of-run summary as a single stdout write.
 fn print_cost_summary(state: &PipelineState) {
-    println!("  Total cost: ${:.2}", state.total_cost);
-    println!("  Phases: {}", state.completed_phases.len());
-    println!("  Logs: {}", state.log_dir.display());
+    print!(
+        "  Total cost: ${:.2}\n  Phases: {}\n  Logs: {}\n",
+        state.total_cost,
+        state.completed_phases.len(),
+        state.log_dir.display()
+    );
+}
+
+/// Tier for each phase0 scope score, indexed by `scope - 1`.
+const SCOPE_TIERS: [Tier; 5] = [
+    Tier::Nano,
+    Tier::Quick,
+    Tier::Lite,
+    Tier::Standard,
+    Tier::Full,
+];
+
+/// Map a scope score to a tier; out-of-range scores fall back to lite.
+fn tier_for_scope(scope: u64) -> Tier {
+    scope
+        .checked_sub(1)
+        .and_then(|i| SCOPE_TIERS.get(i as usize))
+        .copied()
+        .unwrap_or(Tier::Lite)
 }
 
 fn resolve_tier_from_output(result: &PhaseResult) -> Tier {
     let text = result.output.as_deref().unwrap_or("");
-    // Look for scope in JSON output
-    if let Ok(val) = serde_json::from_str::<serde_json::Value>(text) {
-        if let Some(scope) = val.get("scope").and_then(|s| s.as_u64()) {
-            return match scope {
-                1 => Tier::Nano,
-                2 => Tier::Quick,
-                3 => Tier::Lite,
-                4 => Tier::Standard,
-                5 => Tier::Full,
-                _ => Tier::Lite,
-            };
-        }
+    // Look for scope in JSON output, which agents often wrap in prose or a code fence
+    let parsed = serde_json::from_str::<serde_json::Value>(text)
+        .ok()
+        .or_else(|| extract_json_object(text).and_then(|obj| serde_json::from_str(obj).ok()));
+    if let Some(scope) = parsed.and_then(|val| val.get("scope").and_then(|s| s.as_u64())) {
+        return tier_for_scope(scope);
     }
     // Fallback: search for scope pattern in text
-    let re = regex::Regex::new(r"(?i)scope[:\s]*(\d)").unwrap();
+    static SCOPE_RE: OnceLock<Regex> = OnceLock::new();
+    let re = SCOPE_RE.get_or_init(|| Regex::new(r"(?i)scope[:\s]*(\d)").expect("valid regex"));
     if let Some(cap) = re.captures(text) {
-        if let Ok(scope) = cap[1].parse::<u32>() {
-            return match scope {
-                1 => Tier::Nano,
-                2 => Tier::Quick,
-                3 => Tier::Lite,
-                4 => Tier::Standard,
-                5 => Tier::Full,
-                _ => Tier::Lite,
-            };
+        if let Ok(scope) = cap[1].parse::<u64>() {
+            return tier_for_scope(scope);
         }
     }
     Tier::Lite // safe default
 }
 
+/// Return the first balanced `{...}` span in `text`, tracking string
+/// literals so braces inside JSON strings don't affect the depth count.
+fn extract_json_object(text: &str) -> Option<&str> {
+    let bytes = text.as_bytes();
+    let start = text.find('{')?;
+    let (mut depth, mut in_string, mut escaped) = (0usize, false, false);
+    for (i, &b) in bytes.iter().enumerate().skip(start) {
+        if in_string {
+            match b {
+                _ if escaped => escaped = false,
+                b'\\' => escaped = true,
+                b'"' => in_string = false,
+                _ => {}
+            }
+            continue;
+        }
+        match b {
+            b'"' => in_string = true,
+            b'{' => depth += 1,
+            b'}' => {
+                depth -= 1;
+                if depth == 0 {
+                    return Some(&text[start..=i]);
+                }
+            }
+            _ => {}
+        }
+    }
+    None
+}
+
 fn parse_verdict_from_output(result: &PhaseResult) -> Verdict {
     let text = result.output.as_deref().unwrap_or("");
-    let upper = text.to_uppercase();
-    if upper.contains("VERDICT: PASS") || upper.contains("VERDICT:PASS") {
-        Verdict::Pass
-    } else if upper.contains("VERDICT: FAIL") {
-        Verdict::Fail
-    } else if upper.contains("VERDICT: ITERATE") {
-        Verdict::Iterate
-    } else if upper.contains("NEEDS_HUMAN") || upper.contains("NEEDS HUMAN") {
+    // The verdict is almost always the last thing the agent prints, so scan
+    // `VERDICT:` markers from the end; the last recognisable one wins.
+    for pos in find_ignore_case(text, "VERDICT:").rev() {
+        let rest = text[pos + "VERDICT:".len()..]
+            .trim_start_matches(|c: char| c.is_whitespace() || c == '*');
+        if let Some(verdict) = verdict_token(rest) {
+            return verdict;
+        }
+    }
+
+    let mentions = |needle: &str| find_ignore_case(text, needle).next().is_some();
+    if mentions("NEEDS_HUMAN") || mentions("NEEDS HUMAN") {
         Verdict::NeedsHuman
+    } else if mentions("ALL TESTS PASS") || mentions("TESTS PASSED") {
+        // No explicit verdict — fall back to test results
+        Verdict::Pass
     } else {
-        // No explicit verdict — check for test results
-        if upper.contains("ALL TESTS PASS") || upper.contains("TESTS PASSED") {
+        Verdict::Unknown
+    }
+}
+
+/// Words accepted after `VERDICT:`, synonyms included. A token that is a
+/// prefix of another must come after it (`PASS_WITH_NOTES` before `PASS`).
+const VERDICT_TOKENS: &[(&str, Verdict)] = &[
+    ("PASS_WITH_NOTES", Verdict::PassWithNotes),
+    ("AUTO_PASS", Verdict::AutoPass),
+    ("PASS", Verdict::Pass),
+    ("FAIL", Verdict::Fail),
+    ("ITERATE", Verdict::Iterate),
+    ("NEEDS_HUMAN", Verdict::NeedsHuman),
+    ("NEEDS HUMAN", Verdict::NeedsHuman),
+    ("BLOCK", Verdict::Block),
+];
+
+/// Map the word following `VERDICT:` to a verdict.
+fn verdict_token(rest: &str) -> Option<Verdict> {
+    VERDICT_TOKENS
+        .iter()
+        .find(|(token, _)| {
+            rest.get(..token.len())
+                .is_some_and(|head| head.eq_ignore_ascii_case(token))
+        })
+        .map(|&(_, verdict)| verdict)
+}
+
+/// Byte offsets of ASCII case-insensitive matches of `needle` in `text`,
+/// without allocating an uppercased copy of the whole output.
+fn find_ignore_case<'a>(
+    text: &'a str,
+    needle: &'a str,
+) -> impl DoubleEndedIterator<Item = usize> + 'a {
+    text.as_bytes()
+        .windows(needle.len())
+        .enumerate()
+        .filter(move |(_, w)| w.eq_ignore_ascii_case(needle.as_bytes()))
+        .map(|(i, _)| i)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn result_with(output: &str) -> PhaseResult {
+        PhaseResult {
+            name: "phase0".to_string(),
+            cost_usd: 0.0,
+            turns: 0,
+            session_id: String::new(),
+            duration_secs: 0.0,
+            exit_code: 0,
+            is_error: false,
+            output: Some(output.to_string()),
+            watchdog_triggered: false,
+            watchdog_restarts: 0,
+        }
+    }
+
+    #[test]
+    fn test_extract_json_object() {
+        let text =
+            "Scan done.\n```json\n{\"scope\": 4, \"blockers\": [\"a}b\"], \"x\": {\"y\": 1}}\n```";
+        assert_eq!(
+            extract_json_object(text),
+            Some("{\"scope\": 4, \"blockers\": [\"a}b\"], \"x\": {\"y\": 1}}")
+        );
+        assert_eq!(extract_json_object("no object here"), None);
+        assert_eq!(extract_json_object("{\"unterminated\": 1"), None);
+    }
+
+    #[test]
+    fn test_resolve_tier_from_output() {
+        assert_eq!(
+            resolve_tier_from_output(&result_with("{\"scope\": 2}")),
+            Tier::Quick
+        );
+        assert_eq!(
+            resolve_tier_from_output(&result_with(
+                "Result:\n{\"scope\": 5, \"project_type\": \"py\"}"
+            )),
+            Tier::Full
+        );
+        assert_eq!(
+            resolve_tier_from_output(&result_with("Scope: 1")),
+            Tier::Nano
+        );
+        assert_eq!(
+            resolve_tier_from_output(&result_with("nothing")),
+            Tier::Lite
+        );
+        assert_eq!(
+            resolve_tier_from_output(&result_with("{\"scope\": 0}")),
+            Tier::Lite
+        );
+        assert_eq!(
+            resolve_tier_from_output(&result_with("scope: 9")),
+            Tier::Lite
+        );
+    }
+
+    #[test]
+    fn test_write_json_atomic() {
+        let dir = std::env::temp_dir().join(format!("anvil-atomic-{}", std::process::id()));
+        std::fs::create_dir_all(&dir).unwrap();
+        let path = dir.join("costs.json");
+        let value = serde_json::json!({"phases": [], "total_cost": 1.5});
+
+        write_json_atomic(&path, &value, false).unwrap();
+        assert_eq!(std::fs::read_to_string(&path).unwrap(), value.to_string());
+        write_json_atomic(&path, &value, true).unwrap();
+        let written: serde_json::Value =
+            serde_json::from_slice(&std::fs::read(&path).unwrap()).unwrap();
+        assert_eq!(written, value);
+        assert!(!dir.join("costs.json.tmp").exists());
+
+        std::fs::remove_dir_all(&dir).unwrap();
+    }
+
+    #[test]
+    fn test_parse_verdict_from_output() {
+        let verdict = |text: &str| parse_verdict_from_output(&result_with(text));
+        assert_eq!(
+            verdict("Ran 11 tests.\nVERDICT: PASS (0.95)"),
             Verdict::Pass
-        } else {
-            Verdict::Unknown
+        );
+        assert_eq!(verdict("verdict:fail"), Verdict::Fail);
+        assert_eq!(verdict("**VERDICT:** ITERATE, score 0.4"), Verdict::Iterate);
+        // The final verdict wins over one echoed earlier in the transcript.
+        assert_eq!(
+            verdict("Output VERDICT: PASS, FAIL, or ITERATE.\n...\nVERDICT: FAIL"),
+            Verdict::Fail
+        );
+        assert_eq!(
+            verdict("VERDICT: NEEDS_HUMAN\n- auth model?"),
+            Verdict::NeedsHuman
+        );
+        assert_eq!(
+            verdict("Questions remain; needs human input."),
+            Verdict::NeedsHuman
+        );
+        assert_eq!(verdict("All tests pass — café ✓"), Verdict::Pass);
+        assert_eq!(verdict("VERDICT: AUTO_PASS"), Verdict::AutoPass);
+        assert_eq!(verdict("VERDICT: PASS_WITH_NOTES"), Verdict::PassWithNotes);
+        assert_eq!(verdict("VERDICT: BLOCKED"), Verdict::Block);
+        assert_eq!(verdict("VERDICT: see above"), Verdict::Unknown);
+        assert_eq!(verdict(""), Verdict::Unknown);
+    }
+
+    #[test]
+    fn test_skip_mask_matches_skip_lists() {
+        for tier in [
+            Tier::Guard,
+            Tier::Nano,
+            Tier::Quick,
+            Tier::Lite,
+            Tier::Standard,
+            Tier::Full,
+            Tier::Auto,
+        ] {
+            let mask = Phase::skip_mask(tier);
+            for phase in Phase::ALL {
+                assert_eq!(
+                    mask & phase.bit() != 0,
+                    Phase::skipped_by(tier).contains(&phase),
+                    "{tier} / {phase}"
+                );
+            }
         }
     }
+
+    #[test]
+    fn test_render_keeps_prompt_prefix_static() {
+        let a = render(IMPLEMENT_PROMPT, "Add a priority field");
+        let b = render(IMPLEMENT_PROMPT, "Fix the CSV export");
+        assert!(a.starts_with(IMPLEMENT_PROMPT) && b.starts_with(IMPLEMENT_PROMPT));
+        assert!(a.ends_with("\n\nTicket:\nAdd a priority field"));
+    }
 }
@@ -7,9 +7,13 @@
 //! `python3` / `pytest` anyway, so this module is orchestration + JSON parsing,
 //! not a reimplementation of Python's `ast` module.
 
+use std::cell::{OnceCell, RefCell};
+use std::collections::HashMap;
 use std::fs;
-use std::path::Path;
+use std::path::{Path, PathBuf};
 use std::process::Command;
+use std::rc::Rc;
+use std::sync::OnceLock;
 
 use anyhow::{Context, Result};
 use regex::Regex;
@@ -133,9 +137,10 @@ pub fn score_ticket(
     let mut results: Vec<CheckResult> = Vec::new();
     let mut total_weight: u64 = 0;
     let mut earned_weight: u64 = 0;
+    let cache = ScoreCache::default();
 
     for check in &spec.checks {
-        let result = dispatch_check(workdir, check, baseline_dir);
+        let result = dispatch_check(workdir, check, baseline_dir, &cache);
         total_weight += check.weight;
         if result.pass {
             earned_weight += check.weight;
@@ -166,25 +171,24 @@ pub fn score_ticket(
 // Check dispatcher
 // ---------------------------------------------------------------------------
 
-fn dispatch_check(workdir: &Path, check: &CheckSpec, baseline_dir: Option<&Path>) -> CheckResult {
+fn dispatch_check(
+    workdir: &Path,
+    check: &CheckSpec,
+    baseline_dir: Option<&Path>,
+    cache: &ScoreCache,
+) -> CheckResult {
     let handler_result = match check.check_type.as_str() {
         "ast_parse" => check_ast_parse(workdir, check),
-        "pytest" => check_pytest(workdir, None),
-        "pytest_subset" => {
-            let subset = check
-                .subset
-                .as_deref()
-                .or(check.pattern.as_deref())
-                .unwrap_or("");
-            check_pytest(workdir, Some(subset))
-        }
-        "grep_present" => check_grep_present(workdir, check),
-        "grep_absent" => check_grep_absent(workdir, check),
-        "grep_absent_all" => check_grep_absent_all(workdir, check),
+        "pytest" | "pytest_subset" => cache.pytest(workdir, pytest_subset(check)),
+        "grep_present" => check_grep_present(workdir, check, cache),
+        "grep_absent" => check_grep_absent(workdir, check, cache),
+        "grep_absent_all" => check_grep_absent_all(workdir, check, cache),
         "file_exists" => check_file_exists(workdir, check),
-        "test_count_minimum" => check_test_count_minimum(workdir, check),
-        "test_count_increased" => check_test_count_increased(workdir, check),
-        "test_count_files" | "pytest_count_files" => check_pytest_count_files(workdir, check),
+        "test_count_minimum" => check_test_count_minimum(workdir, check, cache),
+        "test_count_increased" => check_test_count_increased(workdir, check, cache),
+        "test_count_files" | "pytest_count_files" => {
+            check_pytest_count_files(workdir, check, cache)
+        }
         "file_unchanged" => check_file_unchanged(workdir, check, baseline_dir),
         unknown => HandlerResult::fail(format!("Unknown check type: {unknown}")),
     };
@@ -200,10 +204,99 @@ fn dispatch_check(workdir: &Path, check: &CheckSpec, baseline_dir: Option<&Path>
     }
 }
 
+// ---------------------------------------------------------------------------
+// Per-call memoization
+// ---------------------------------------------------------------------------
+
+/// Values shared by several checks of one `score_ticket` call. The workdir
+/// does not change while a spec is being scored, so each is computed once.
+#[derive(Default)]
+struct ScoreCache {
+    test_functions: OnceCell<u64>,
+    test_files: OnceCell<u64>,
+    /// pytest results keyed by `-k` subset. Runs happen one at a time: test
+    /// suites may share state in the workdir (e.g. `products.json`).
+    pytest_runs: RefCell<HashMap<Option<String>, HandlerResult>>,
+    /// Source files read by grep checks; several checks often share a file.
+    file_contents: RefCell<HashMap<PathBuf, Result<Rc<str>, String>>>,
+    /// Compiled grep patterns, keyed by pattern text.
+    patterns: RefCell<HashMap<String, Result<Pattern, String>>>,
+}
+
+impl ScoreCache {
+    fn pytest(&self, workdir: &Path, subset: Option<&str>) -> HandlerResult {
+        self.pytest_runs
+            .borrow_mut()
+            .entry(subset.map(str::to_string))
+            .or_insert_with(|| check_pytest(workdir, subset))
+            .clone()
+    }
+
+    fn read(&self, path: &Path) -> Result<Rc<str>, String> {
+        self.file_contents
+            .borrow_mut()
+            .entry(path.to_path_buf())
+            .or_insert_with(|| {
+                fs::read_to_string(path)
+                    .map(Rc::from)
+                    .map_err(|e| e.to_string())
+            })
+            .clone()
+    }
+
+    fn pattern(&self, pattern: &str) -> Result<Pattern, String> {
+        if let Some(p) = self.patterns.borrow().get(pattern) {
+            return p.clone();
+        }
+        let compiled = Pattern::new(pattern);
+        self.patterns
+            .borrow_mut()
+            .insert(pattern.to_string(), compiled.clone());
+        compiled
+    }
+
+    fn test_functions(&self, workdir: &Path) -> u64 {
+        *self
+            .test_functions
+            .get_or_init(|| count_test_functions(workdir))
+    }
+
+    fn test_files(&self, workdir: &Path) -> u64 {
+        *self.test_files.get_or_init(|| count_test_files(workdir))
+    }
+}
+
+/// A grep pattern. Patterns without regex metacharacters (e.g. `search`,
+/// `last_adjusted`) skip regex compilation and use a plain substring scan.
+#[derive(Clone)]
+enum Pattern {
+    Literal(String),
+    Regex(Regex),
+}
+
+impl Pattern {
+    fn new(pattern: &str) -> Result<Self, String> {
+        if regex::escape(pattern) == pattern {
+            return Ok(Pattern::Literal(pattern.to_string()));
+        }
+        Regex::new(pattern)
+            .map(Pattern::Regex)
+            .map_err(|e| e.to_string())
+    }
+
+    fn is_match(&self, haystack: &str) -> bool {
+        match self {
+            Pattern::Literal(s) => haystack.contains(s.as_str()),
+            Pattern::Regex(re) => re.is_match(haystack),
+        }
+    }
+}
+
 // ---------------------------------------------------------------------------
 // Internal result type for check handlers
 // ---------------------------------------------------------------------------
 
+#[derive(Clone)]
 struct HandlerResult {
     pass: bool,
     detail: String,
@@ -265,8 +358,34 @@ fn check_ast_parse(workdir: &Path, check: &CheckSpec) -> HandlerResult {
 /// Run `python3 -m pytest tests/ -v --tb=short` and check exit code.
 /// If `subset` is provided, adds `-k <subset>` to the command.
 fn check_pytest(workdir: &Path, subset: Option<&str>) -> HandlerResult {
+    let cache_path = pytest_cache_path(workdir, subset);
+    if let Some(hit) = cache_path.as_deref().and_then(load_cached_pytest) {
+        return hit;
+    }
+    let (result, completed) = run_pytest(workdir, subset);
+    // Only cache runs that finished and reported, not a missing pytest, an
+    // interrupted session or a killed process.
+    if let (Some(path), true) = (cache_path.as_deref(), completed) {
+        store_cached_pytest(path, &result);
+    }
+    result
+}
+
+/// Run pytest over `workdir`. The flag is true when the session ran to
+/// completion: exit 0 (all passed) or 1 (some failed) with a summary line.
+fn run_pytest(workdir: &Path, subset: Option<&str>) -> (HandlerResult, bool) {
     let mut cmd = Command::new("python3");
-    cmd.args(["-m", "pytest", "tests/", "-v", "--tb=short"]);
+    // no:cacheprovider keeps scoring from writing .pytest_cache into the
+    // workdir under evaluation.
+    cmd.args([
+        "-m",
+        "pytest",
+        "tests/",
+        "-v",
+        "--tb=short",
+        "-p",
+        "no:cacheprovider",
+    ]);
     if let Some(k) = subset {
         cmd.args(["-k", k]);
     }
@@ -279,27 +398,23 @@ fn check_pytest(workdir: &Path, subset: Option<&str>) -> HandlerResult {
             let count = extract_pytest_count(&stdout_str);
             let exit_code = output.status.code().unwrap_or(-1);
 
-            let stdout_tail = if !passed {
-                let s = stdout_str.as_ref();
-                let tail_start = s.len().saturating_sub(500);
-                Some(s[tail_start..].to_string())
-            } else {
-                None
-            };
+            let stdout_tail = (!passed).then(|| tail_lines(&stdout_str, STDOUT_TAIL_BYTES));
+            let completed = matches!(exit_code, 0 | 1) && has_pytest_summary(&stdout_str);
 
-            HandlerResult {
+            let result = HandlerResult {
                 pass: passed,
                 detail: format!("pytest exit={exit_code}, {count} passed"),
                 test_count: Some(count),
                 stdout: stdout_tail,
-            }
+            };
+            (result, completed)
         }
-        Err(e) => HandlerResult::fail(format!("pytest error: {e}")),
+        Err(e) => (HandlerResult::fail(format!("pytest error: {e}")), false),
     }
 }
 
 /// Verify regex pattern is found in file.
-fn check_grep_present(workdir: &Path, check: &CheckSpec) -> HandlerResult {
+fn check_grep_present(workdir: &Path, check: &CheckSpec, cache: &ScoreCache) -> HandlerResult {
     let (file, pattern) = match (check.file.as_deref(), check.pattern.as_deref()) {
         (Some(f), Some(p)) => (f, p),
         _ => return HandlerResult::fail("grep_present requires 'file' and 'pattern'"),
@@ -308,20 +423,20 @@ fn check_grep_present(workdir: &Path, check: &CheckSpec) -> HandlerResult {
     if !filepath.exists() {
         return HandlerResult::fail(format!("File not found: {file}"));
     }
-    let content = match fs::read_to_string(&filepath) {
+    let content = match cache.read(&filepath) {
         Ok(c) => c,
         Err(e) => return HandlerResult::fail(format!("Failed to read {file}: {e}")),
     };
     let desc = check.description.as_deref().unwrap_or(pattern);
-    match Regex::new(pattern) {
-        Ok(re) if re.is_match(&content) => HandlerResult::ok(format!("Pattern found: {desc}")),
+    match cache.pattern(pattern) {
+        Ok(p) if p.is_match(&content) => HandlerResult::ok(format!("Pattern found: {desc}")),
         Ok(_) => HandlerResult::fail(format!("Pattern not found: {desc}")),
         Err(e) => HandlerResult::fail(format!("Invalid regex '{pattern}': {e}")),
     }
 }
 
 /// Verify regex pattern is NOT found in file.
-fn check_grep_absent(workdir: &Path, check: &CheckSpec) -> HandlerResult {
+fn check_grep_absent(workdir: &Path, check: &CheckSpec, cache: &ScoreCache) -> HandlerResult {
     let (file, pattern) = match (check.file.as_deref(), check.pattern.as_deref()) {
         (Some(f), Some(p)) => (f, p),
         _ => return HandlerResult::fail("grep_absent requires 'file' and 'pattern'"),
@@ -331,13 +446,13 @@ fn check_grep_absent(workdir: &Path, check: &CheckSpec) -> HandlerResult {
         // File not found means pattern is trivially absent (matches Python behavior).
         return HandlerResult::ok("File not found (pattern trivially absent)");
     }
-    let content = match fs::read_to_string(&filepath) {
+    let content = match cache.read(&filepath) {
         Ok(c) => c,
         Err(e) => return HandlerResult::fail(format!("Failed to read {file}: {e}")),
     };
     let desc = check.description.as_deref().unwrap_or(pattern);
-    match Regex::new(pattern) {
-        Ok(re) if re.is_match(&content) => {
+    match cache.pattern(pattern) {
+        Ok(p) if p.is_match(&content) => {
             HandlerResult::fail(format!("Pattern still present: {desc}"))
         }
         Ok(_) => HandlerResult::ok(format!("Pattern absent: {desc}")),
@@ -346,7 +461,7 @@ fn check_grep_absent(workdir: &Path, check: &CheckSpec) -> HandlerResult {
 }
 
 /// Verify regex pattern is absent from ALL files matching a glob pattern.
-fn check_grep_absent_all(workdir: &Path, check: &CheckSpec) -> HandlerResult {
+fn check_grep_absent_all(workdir: &Path, check: &CheckSpec, cache: &ScoreCache) -> HandlerResult {
     let pattern = match check.pattern.as_deref() {
         Some(p) => p,
         None => return HandlerResult::fail("grep_absent_all requires 'pattern'"),
@@ -357,7 +472,7 @@ fn check_grep_absent_all(workdir: &Path, check: &CheckSpec) -> HandlerResult {
         .clone()
         .unwrap_or_else(|| format!("Pattern absent from {file_glob}"));
 
-    let re = match Regex::new(pattern) {
+    let matcher = match cache.pattern(pattern) {
         Ok(r) => r,
         Err(e) => return HandlerResult::fail(format!("Invalid regex '{pattern}': {e}")),
     };
@@ -377,8 +492,8 @@ fn check_grep_absent_all(workdir: &Path, check: &CheckSpec) -> HandlerResult {
         if !path.is_file() {
             continue;
         }
-        if let Ok(content) = fs::read_to_string(&path) {
-            if re.is_match(&content) {
+        if let Ok(content) = cache.read(&path) {
+            if matcher.is_match(&content) {
                 let rel = path
                     .strip_prefix(workdir)
                     .unwrap_or(&path)
@@ -411,9 +526,13 @@ fn check_file_exists(workdir: &Path, check: &CheckSpec) -> HandlerResult {
 }
 
 /// Verify at least N test functions exist.
-fn check_test_count_minimum(workdir: &Path, check: &CheckSpec) -> HandlerResult {
+fn check_test_count_minimum(
+    workdir: &Path,
+    check: &CheckSpec,
+    cache: &ScoreCache,
+) -> HandlerResult {
     let minimum = check.minimum.unwrap_or(1);
-    let count = count_test_functions(workdir);
+    let count = cache.test_functions(workdir);
     let passed = count >= minimum;
     HandlerResult {
         pass: passed,
@@ -424,9 +543,13 @@ fn check_test_count_minimum(workdir: &Path, check: &CheckSpec) -> HandlerResult
 }
 
 /// Verify test count increased from baseline.
-fn check_test_count_increased(workdir: &Path, check: &CheckSpec) -> HandlerResult {
+fn check_test_count_increased(
+    workdir: &Path,
+    check: &CheckSpec,
+    cache: &ScoreCache,
+) -> HandlerResult {
     let baseline = check.baseline.unwrap_or(5);
-    let count = count_test_functions(workdir);
+    let count = cache.test_functions(workdir);
     let passed = count > baseline;
     HandlerResult {
         pass: passed,
@@ -437,9 +560,13 @@ fn check_test_count_increased(workdir: &Path, check: &CheckSpec) -> HandlerResul
 }
 
 /// Count test files (not just test functions).
-fn check_pytest_count_files(workdir: &Path, check: &CheckSpec) -> HandlerResult {
+fn check_pytest_count_files(
+    workdir: &Path,
+    check: &CheckSpec,
+    cache: &ScoreCache,
+) -> HandlerResult {
     let minimum = check.minimum.unwrap_or(1);
-    let count = count_test_files(workdir);
+    let count = cache.test_files(workdir);
     let passed = count >= minimum;
     let desc = check
         .description
@@ -475,26 +602,56 @@ fn check_file_unchanged(
     if !baseline_path.exists() {
         return HandlerResult::fail(format!("Baseline not found: {}", baseline_path.display()));
     }
-    let h1 = sha256_file(&filepath);
-    let h2 = sha256_file(&baseline_path);
-    match (h1, h2) {
-        (Ok(a), Ok(b)) => {
-            let passed = a == b;
-            HandlerResult {
-                pass: passed,
-                detail: format!("SHA match: {passed} ({file})"),
-                test_count: None,
-                stdout: None,
-            }
-        }
-        (Err(e), _) | (_, Err(e)) => HandlerResult::fail(format!("Hash error: {e}")),
+    match files_match(&filepath, &baseline_path) {
+        Ok(passed) => HandlerResult {
+            pass: passed,
+            detail: format!("SHA match: {passed} ({file})"),
+            test_count: None,
+            stdout: None,
+        },
+        Err(e) => HandlerResult::fail(format!("Hash error: {e}")),
+    }
+}
+
+/// Files below this size are compared byte-for-byte; hashing them is
+/// mostly setup overhead.
+const SMALL_FILE_BYTES: u64 = 64 * 1024;
+
+/// Whether two files have identical contents. A size mismatch answers
+/// without reading either file; small files are compared directly and only
+/// large equal-sized files are hashed.
+fn files_match(a: &Path, b: &Path) -> Result<bool, String> {
+    let size_a = fs::metadata(a).map_err(|e| e.to_string())?.len();
+    let size_b = fs::metadata(b).map_err(|e| e.to_string())?.len();
+    if size_a != size_b {
+        return Ok(false);
     }
+    if size_a < SMALL_FILE_BYTES {
+        let read = |p: &Path| fs::read(p).map_err(|e| format!("reading {}: {e}", p.display()));
+        return Ok(read(a)? == read(b)?);
+    }
+    let hash = |p: &Path| sha256_file(p).map_err(|e| e.to_string());
+    Ok(hash(a)? == hash(b)?)
 }
 
 // ---------------------------------------------------------------------------
 // Helpers
 // ---------------------------------------------------------------------------
 
+/// The `-k` expression for a pytest check, or `None` for the full suite.
+fn pytest_subset(check: &CheckSpec) -> Option<&str> {
+    if check.check_type != "pytest_subset" {
+        return None;
+    }
+    Some(
+        check
+            .subset
+            .as_deref()
+            .or(check.pattern.as_deref())
+            .unwrap_or(""),
+    )
+}
+
 fn load_spec(path: &Path) -> Result<ExpectedSpec> {
     let data = fs::read_to_string(path)
         .with_context(|| format!("reading spec from {}", path.display()))?;
@@ -509,20 +666,26 @@ fn count_test_functions(workdir: &Path) -> u64 {
     if !tests_dir.is_dir() {
         return 0;
     }
-    let re = Regex::new(r"^\s*def test_").expect("valid regex");
     let mut count: u64 = 0;
     walk_test_files(&tests_dir, &mut |path| {
-        if let Ok(content) = fs::read_to_string(path) {
-            for line in content.lines() {
-                if re.is_match(line) {
-                    count += 1;
-                }
-            }
+        if let Ok(content) = fs::read(path) {
+            count += count_test_defs(&content);
         }
     });
     count
 }
 
+/// Count lines starting with `def test_` (after indentation) in one file.
+///
+/// One multi-line scan over the raw bytes: no per-line iteration and no
+/// UTF-8 validation of test sources.
+fn count_test_defs(content: &[u8]) -> u64 {
+    static TEST_DEF_RE: OnceLock<regex::bytes::Regex> = OnceLock::new();
+    let re = TEST_DEF_RE
+        .get_or_init(|| regex::bytes::Regex::new(r"(?m)^[ \t]*def test_").expect("valid regex"));
+    re.find_iter(content).count() as u64
+}
+
 /// Count test files (`test_*.py`) under `tests/`.
 fn count_test_files(workdir: &Path) -> u64 {
     let tests_dir = workdir.join("tests");
@@ -554,21 +717,248 @@ fn walk_test_files(dir: &Path, visitor: &mut impl FnMut(&Path)) {
     }
 }
 
+// ---------------------------------------------------------------------------
+// Pytest result cache
+// ---------------------------------------------------------------------------
+
+/// On-disk form of a pytest check result.
+#[derive(Serialize, Deserialize)]
+struct CachedPytest {
+    pass: bool,
+    detail: String,
+    test_count: Option<u64>,
+    stdout: Option<String>,
+}
+
+/// Cache file for a pytest run over `workdir`, or `None` when caching is
+/// disabled (`ANVIL_NO_SCORE_CACHE`) or no cache directory can be resolved.
+///
+/// Entries are keyed by a fingerprint of every Python/pytest config file in
+/// the workdir plus the `-k` subset and the Python environment (interpreter,
+/// pytest version), so any edit or environment change is a miss. Stale
+/// entries are never looked up again; `prune_pytest_cache` deletes them once
+/// they are older than `CACHE_MAX_AGE`.
+fn pytest_cache_path(workdir: &Path, subset: Option<&str>) -> Option<PathBuf> {
+    if std::env::var_os("ANVIL_NO_SCORE_CACHE").is_some() {
+        return None;
+    }
+    let base = std::env::var_os("XDG_CACHE_HOME")
+        .map(PathBuf::from)
+        .or_else(|| std::env::var_os("HOME").map(|h| PathBuf::from(h).join(".cache")))?;
+    let salt = format!("{}\0{}", subset.unwrap_or(""), python_env_salt());
+    let fingerprint = workdir_fingerprint(workdir, &salt).ok()?;
+    Some(
+        base.join("anvil-score")
+            .join("pytest")
+            .join(format!("{fingerprint}.json")),
+    )
+}
+
+fn load_cached_pytest(path: &Path) -> Option<HandlerResult> {
+    let data = fs::read(path).ok()?;
+    let cached: CachedPytest = serde_json::from_slice(&data).ok()?;
+    Some(HandlerResult {
+        pass: cached.pass,
+        detail: cached.detail,
+        test_count: cached.test_count,
+        stdout: cached.stdout,
+    })
+}
+
+/// Best-effort write (tmp + rename) so concurrent scorers never observe a
+/// partially written entry. Failures only cost a future cache miss.
+fn store_cached_pytest(path: &Path, result: &HandlerResult) {
+    let cached = CachedPytest {
+        pass: result.pass,
+        detail: result.detail.clone(),
+        test_count: result.test_count,
+        stdout: result.stdout.clone(),
+    };
+    let Some(dir) = path.parent() else { return };
+    let Ok(json) = serde_json::to_vec(&cached) else {
+        return;
+    };
+    let tmp = path.with_extension(format!("json.tmp.{}", std::process::id()));
+    if fs::create_dir_all(dir).is_ok()
+        && fs::write(&tmp, json).is_ok()
+        && fs::rename(&tmp, path).is_err()
+    {
+        let _ = fs::remove_file(&tmp);
+    }
+    prune_pytest_cache(dir);
+}
+
+/// Cache entries older than this are deleted by `prune_pytest_cache`.
+const CACHE_MAX_AGE: std::time::Duration = std::time::Duration::from_secs(30 * 24 * 60 * 60);
+
+/// Delete cache entries (and orphaned temp files) last written more than
+/// `CACHE_MAX_AGE` ago. Runs at most once per process; best-effort.
+fn prune_pytest_cache(dir: &Path) {
+    static PRUNED: OnceLock<()> = OnceLock::new();
+    PRUNED.get_or_init(|| {
+        let Ok(entries) = fs::read_dir(dir) else {
+            return;
+        };
+        for entry in entries.flatten() {
+            let expired = entry
+                .metadata()
+                .and_then(|m| m.modified())
+                .ok()
+                .and_then(|t| t.elapsed().ok())
+                .is_some_and(|age| age > CACHE_MAX_AGE);
+            if expired {
+                let _ = fs::remove_file(entry.path());
+            }
+        }
+    });
+}
+
+/// SHA-256 over the relative path and contents of every `*.py` file (and
+/// pytest config file) under `workdir`, in sorted order, followed by `salt`.
+fn workdir_fingerprint(workdir: &Path, salt: &str) -> Result<String> {
+    use sha2::{Digest, Sha256};
+    let mut files: Vec<PathBuf> = Vec::new();
+    collect_fingerprint_files(workdir, &mut files);
+    files.sort();
+    let mut hasher = Sha256::new();
+    for path in &files {
+        let rel = path.strip_prefix(workdir).unwrap_or(path);
+        let data = fs::read(path).with_context(|| format!("reading {}", path.display()))?;
+        hasher.update(rel.to_string_lossy().as_bytes());
+        hasher.update([0u8]);
+        hasher.update((data.len() as u64).to_le_bytes());
+        hasher.update(&data);
+    }
+    hasher.update(salt.as_bytes());
+    Ok(format!("{:x}", hasher.finalize()))
+}
+
+/// Collect files that can change a pytest outcome, skipping hidden
+/// directories, bytecode caches, build output and virtualenvs.
+fn collect_fingerprint_files(dir: &Path, out: &mut Vec<PathBuf>) {
+    let entries = match fs::read_dir(dir) {
+        Ok(e) => e,
+        Err(_) => return,
+    };
+    for entry in entries.flatten() {
+        let path = entry.path();
+        let name = entry.file_name();
+        let name = name.to_string_lossy();
+        if path.is_dir() {
+            let skip = name.starts_with('.')
+                || name.ends_with(".egg-info")
+                || matches!(
+                    name.as_ref(),
+                    "__pycache__" | "build" | "dist" | "node_modules" | "venv"
+                )
+                // Virtualenvs under any other name.
+                || path.join("pyvenv.cfg").is_file();
+            if !skip {
+                collect_fingerprint_files(&path, out);
+            }
+        } else if name.ends_with(".py")
+            || matches!(
+                name.as_ref(),
+                "pytest.ini" | "pyproject.toml" | "setup.cfg" | "tox.ini"
+            )
+        {
+            out.push(path);
+        }
+    }
+}
+
+/// Interpreter and pytest versions, which both affect a run's outcome.
+/// Probed once per process.
+fn python_env_salt() -> &'static str {
+    static SALT: OnceLock<String> = OnceLock::new();
+    SALT.get_or_init(|| {
+        // Older pytest prints its version on stderr, so keep both streams.
+        let probe = |args: &[&str]| {
+            Command::new("python3")
+                .args(args)
+                .output()
+                .map(|o| {
+                    let mut text = String::from_utf8_lossy(&o.stdout).into_owned();
+                    text.push_str(&String::from_utf8_lossy(&o.stderr));
+                    text.trim().to_string()
+                })
+                .unwrap_or_default()
+        };
+        format!(
+            "{}\0{}",
+            probe(&["--version"]),
+            probe(&["-m", "pytest", "--version"])
+        )
+    })
+}
+
+/// Whether pytest printed its final `=== ... in 0.12s ===` summary line.
+fn has_pytest_summary(stdout: &str) -> bool {
+    static SUMMARY_RE: OnceLock<Regex> = OnceLock::new();
+    let re = SUMMARY_RE
+        .get_or_init(|| Regex::new(r"(?m)^=+ .+ in [\d.]+s\b.*=+\s*$").expect("valid regex"));
+    re.is_match(stdout)
+}
+
 /// Extract the "N passed" count from pytest output.
 fn extract_pytest_count(stdout: &str) -> u64 {
-    let re = Regex::new(r"(\d+) passed").expect("valid regex");
+    static PASSED_RE: OnceLock<Regex> = OnceLock::new();
+    let re = PASSED_RE.get_or_init(|| Regex::new(r"(\d+) passed").expect("valid regex"));
     re.captures(stdout)
         .and_then(|c| c.get(1))
         .and_then(|m| m.as_str().parse().ok())
         .unwrap_or(0)
 }
 
+/// Byte budget for the stdout excerpt kept from a failing pytest run.
+const STDOUT_TAIL_BYTES: usize = 500;
+
+/// Keep roughly the last `max` bytes of `text`, starting on a line boundary
+/// so a multi-byte character or traceback line is never cut in half.
+/// A truncated excerpt is prefixed with a marker.
+pub fn tail_lines(text: &str, max: usize) -> String {
+    if text.len() <= max {
+        return text.to_string();
+    }
+    let mut start = text.len() - max;
+    while !text.is_char_boundary(start) {
+        start += 1;
+    }
+    // Prefer the next full line; fall back to the char boundary for output
+    // that is one long line.
+    if let Some(nl) = text[start..]
+        .find('\n')
+        .filter(|&nl| nl + 1 < text.len() - start)
+    {
+        start += nl + 1;
+    }
+    format!("...[truncated]...\n{}", &text[start..])
+}
+
 /// Compute SHA-256 hex digest of a file.
+///
+/// Streams the file through the hasher in 1 MiB chunks so large baselines
+/// are never held in memory whole; `sha2` picks up SHA-NI / ARMv8 SHA
+/// extensions at runtime when the CPU has them.
 fn sha256_file(path: &Path) -> Result<String> {
     use sha2::{Digest, Sha256};
-    let data = fs::read(path).with_context(|| format!("reading {}", path.display()))?;
-    let hash = Sha256::digest(&data);
-    Ok(format!("{:x}", hash))
+    use std::io::Read;
+
+    const CHUNK: usize = 1 << 20;
+    let mut file = fs::File::open(path).with_context(|| format!("reading {}", path.display()))?;
+    let len = file.metadata().map(|m| m.len() as usize).unwrap_or(CHUNK);
+    let mut buf = vec![0u8; len.clamp(1, CHUNK)];
+    let mut hasher = Sha256::new();
+    loop {
+        let n = match file.read(&mut buf) {
+            Ok(0) => break,
+            Ok(n) => n,
+            Err(e) if e.kind() == std::io::ErrorKind::Interrupted => continue,
+            Err(e) => return Err(e).with_context(|| format!("reading {}", path.display())),
+        };
+        hasher.update(&buf[..n]);
+    }
+    Ok(format!("{:x}", hasher.finalize()))
 }
 
 /// Produce a Python-safe quoted string literal. Uses repr-style single quotes
@@ -602,6 +992,31 @@ mod tests {
         assert_eq!(extract_pytest_count("no tests ran"), 0);
     }
 
+    #[test]
+    fn test_has_pytest_summary() {
+        assert!(has_pytest_summary(
+            "tests/test_a.py::test_x PASSED\n===== 5 passed in 0.23s =====\n"
+        ));
+        assert!(has_pytest_summary(
+            "=== 1 failed, 4 passed in 65.20s (0:01:05) ==="
+        ));
+        assert!(!has_pytest_summary(
+            "/usr/bin/python3: No module named pytest\n"
+        ));
+        // Interrupted sessions end with a banner, not a summary.
+        assert!(!has_pytest_summary(
+            "!!!!!!!! Interrupted: 1 error during collection !!!!!!!!\n"
+        ));
+    }
+
+    #[test]
+    fn test_tail_lines() {
+        assert_eq!(tail_lines("1 failed\n", 500), "1 failed\n");
+        assert_eq!(tail_lines("abc\ndef\nghi\n", 6), "...[truncated]...\nghi\n");
+        // A cut inside a multi-byte character moves forward to its end.
+        assert_eq!(tail_lines("ééé", 3), "...[truncated]...\né");
+    }
+
     #[test]
     fn test_quote_python_string() {
         assert_eq!(quote_python_string("hello"), "'hello'");
@@ -609,6 +1024,126 @@ mod tests {
         assert_eq!(quote_python_string("a\\b"), "'a\\\\b'");
     }
 
+    #[test]
+    fn test_count_test_defs() {
+        let src = b"import pytest\n\ndef test_a():\n    pass\n\nclass TestX:\n    def test_b(self):\n        pass\n\n\tdef test_c(self): pass\ndef helper_test_d(): pass\n# def test_e\n";
+        assert_eq!(count_test_defs(src), 3);
+        assert_eq!(count_test_defs(b"def test_crlf():\r\n    pass\r\n"), 1);
+        assert_eq!(count_test_defs(b""), 0);
+    }
+
+    #[test]
+    fn test_sha256_file_streams() {
+        use sha2::{Digest, Sha256};
+        let path = std::env::temp_dir().join(format!("anvil-sha-{}", std::process::id()));
+        // Spans more than one read chunk.
+        let data: Vec<u8> = (0..(3 << 19)).map(|i| (i % 251) as u8).collect();
+        fs::write(&path, &data).unwrap();
+        assert_eq!(
+            sha256_file(&path).unwrap(),
+            format!("{:x}", Sha256::digest(&data))
+        );
+        fs::write(&path, b"").unwrap();
+        assert_eq!(
+            sha256_file(&path).unwrap(),
+            format!("{:x}", Sha256::digest(b""))
+        );
+        fs::remove_file(&path).unwrap();
+    }
+
+    #[test]
+    fn test_files_match() {
+        let root = std::env::temp_dir().join(format!("anvil-match-{}", std::process::id()));
+        let (work, base) = (root.join("work"), root.join("base"));
+        let big = "x".repeat(SMALL_FILE_BYTES as usize);
+        for dir in [&work, &base] {
+            fs::create_dir_all(dir).unwrap();
+            fs::write(dir.join("a.py"), &big).unwrap();
+            fs::write(dir.join("small.py"), "s = 1\n").unwrap();
+        }
+        fs::write(work.join("c.py"), &big).unwrap();
+        fs::write(base.join("c.py"), "c = 1\n").unwrap();
+
+        let pair = |f: &str| files_match(&work.join(f), &base.join(f)).unwrap();
+        assert!(pair("a.py"));
+        assert!(pair("small.py"));
+        assert!(!pair("c.py"));
+        fs::write(work.join("small.py"), "s = 2\n").unwrap();
+        assert!(!pair("small.py"));
+
+        fs::remove_dir_all(&root).unwrap();
+    }
+
+    #[test]
+    fn test_workdir_fingerprint_tracks_content() {
+        let dir = std::env::temp_dir().join(format!("anvil-fp-{}", std::process::id()));
+        fs::create_dir_all(dir.join("tests")).unwrap();
+        fs::write(dir.join("tests").join("test_a.py"), "def test_a(): pass\n").unwrap();
+        fs::write(dir.join("notes.txt"), "ignored").unwrap();
+
+        let first = workdir_fingerprint(&dir, "").unwrap();
+        assert_eq!(first, workdir_fingerprint(&dir, "").unwrap());
+        assert_ne!(first, workdir_fingerprint(&dir, "subset").unwrap());
+
+        fs::write(dir.join("notes.txt"), "still ignored").unwrap();
+        assert_eq!(first, workdir_fingerprint(&dir, "").unwrap());
+
+        // Virtualenvs (by name or by pyvenv.cfg) and build output are skipped.
+        for sub in ["venv", "build", "myenv"] {
+            fs::create_dir_all(dir.join(sub)).unwrap();
+            fs::write(dir.join(sub).join("site.py"), "x = 1\n").unwrap();
+        }
+        fs::write(dir.join("myenv").join("pyvenv.cfg"), "home = /usr\n").unwrap();
+        assert_eq!(first, workdir_fingerprint(&dir, "").unwrap());
+
+        fs::write(
+            dir.join("tests").join("test_a.py"),
+            "def test_a(): assert 0\n",
+        )
+        .unwrap();
+        assert_ne!(first, workdir_fingerprint(&dir, "").unwrap());
+
+        fs::remove_dir_all(&dir).unwrap();
+    }
+
+    #[test]
+    fn test_pattern_literal_fast_path() {
+        for p in ["search", "last_adjusted", "class Validator"] {
+            assert!(matches!(Pattern::new(p), Ok(Pattern::Literal(_))), "{p}");
+        }
+        for p in [r"eval\(", "# BUG", r"def test.*search"] {
+            assert!(matches!(Pattern::new(p), Ok(Pattern::Regex(_))), "{p}");
+        }
+        assert!(Pattern::new("search").unwrap().is_match("def search(q):"));
+        assert!(!Pattern::new("search").unwrap().is_match("def find(q):"));
+        assert!(Pattern::new("(").is_err());
+    }
+
+    #[test]
+    fn test_score_grep_checks_share_file() {
+        let root = std::env::temp_dir().join(format!("anvil-grep-{}", std::process::id()));
+        let expected = root.join("tickets").join("expected");
+        fs::create_dir_all(&expected).unwrap();
+        fs::write(root.join("mod.py"), "def search(q):\n    return q\n").unwrap();
+        fs::write(
+            expected.join("T-1.json"),
+            r#"{"ticket": "T-1", "description": "grep", "checks": [
+                {"type": "grep_present", "file": "mod.py", "pattern": "def search\\(", "weight": 2},
+                {"type": "grep_absent", "file": "mod.py", "pattern": "eval\\(", "weight": 1},
+                {"type": "grep_present", "file": "mod.py", "pattern": "def search\\(", "weight": 1},
+                {"type": "grep_present", "file": "mod.py", "pattern": "(", "weight": 1}]}"#,
+        )
+        .unwrap();
+
+        let result = score_ticket(&root, "T-1", None, &root);
+        let passes: Vec<bool> = result.checks.iter().map(|c| c.pass).collect();
+        assert_eq!(passes, [true, true, true, false]);
+        assert!(result.checks[3].detail.starts_with("Invalid regex"));
+        assert_eq!(result.score, 80);
+
+        fs::remove_dir_all(&root).unwrap();
+    }
+
     #[test]
     fn test_score_missing_ticket() {
         let result = score_ticket(
@@ -1,26 +1,16 @@
 //! Stagnation detection: identifies when retry attempts produce the same errors.
 
-use similar::TextDiff;
-use std::path::Path;
+use std::collections::HashSet;
 
-/// Check if the current attempt's errors are too similar to the previous attempt.
-/// Returns true if similarity exceeds threshold (0.0-1.0).
-pub fn check_stagnation(log_dir: &Path, phase_name: &str, attempt: u32, threshold: f64) -> bool {
-    if attempt <= 1 {
-        return false;
-    }
-
-    let prev_path = log_dir.join(format!("{}-attempt-{}.stderr", phase_name, attempt - 1));
-    let curr_path = log_dir.join(format!("{}-attempt-{}.stderr", phase_name, attempt));
-
-    let (prev_text, curr_text) = match (
-        std::fs::read_to_string(&prev_path),
-        std::fs::read_to_string(&curr_path),
-    ) {
-        (Ok(p), Ok(c)) => (p, c),
-        _ => return false,
-    };
+/// Window size (in bytes) for shingling attempt output.
+const SHINGLE_LEN: usize = 8;
+/// Multiplier for the polynomial rolling hash (arithmetic is mod 2^64).
+const HASH_BASE: u64 = 0x100_0000_01b3;
 
+/// Check if the current attempt's errors are too similar to the previous attempt's.
+/// `attempt` is the current attempt number and is only used for logging.
+/// Returns true if similarity exceeds threshold (0.0-1.0).
+pub fn check_stagnation(prev_text: &str, curr_text: &str, attempt: u32, threshold: f64) -> bool {
     if prev_text.is_empty() || curr_text.is_empty() {
         return false;
     }
@@ -35,11 +25,23 @@ pub fn check_stagnation(log_dir: &Path, phase_name: &str, attempt: u32, threshol
         return true;
     }
 
-    // Similarity ratio
-    let diff = TextDiff::from_lines(&prev_text, &curr_text);
-    let ratio = diff.ratio();
+    // Similarity ratio: Dice coefficient (2·shared / total) over byte shingles,
+    // linear in input size. This is the same scale as difflib's ratio, which
+    // `stagnation_similarity` was tuned against.
+    let (prev_set, curr_set) = (
+        shingles(prev_text.as_bytes()),
+        shingles(curr_text.as_bytes()),
+    );
+    // At most `lo` shingles can be shared, so the coefficient is bounded by
+    // 2·lo / (lo + hi); skip the intersection pass when that rules it out.
+    let lo = prev_set.len().min(curr_set.len());
+    let hi = prev_set.len().max(curr_set.len());
+    if 2.0 * (lo as f64) < threshold * (lo + hi) as f64 {
+        return false;
+    }
+    let ratio = dice(&prev_set, &curr_set);
 
-    if (ratio as f64) >= threshold {
+    if ratio >= threshold {
         tracing::warn!(
             "Stagnation: attempt {} is {:.0}% similar to attempt {} (threshold: {:.0}%)",
             attempt,
@@ -52,3 +54,86 @@ pub fn check_stagnation(log_dir: &Path, phase_name: &str, attempt: u32, threshol
 
     false
 }
+
+/// Hash every `SHINGLE_LEN`-byte window of `bytes` with a rolling hash.
+/// Inputs shorter than one window hash as a single shingle.
+fn shingles(bytes: &[u8]) -> HashSet<u64> {
+    if bytes.len() <= SHINGLE_LEN {
+        return HashSet::from([window_hash(bytes)]);
+    }
+
+    // HASH_BASE^SHINGLE_LEN, used to drop the byte leaving the window.
+    let drop_factor = HASH_BASE.wrapping_pow(SHINGLE_LEN as u32);
+    let mut set = HashSet::with_capacity(bytes.len() - SHINGLE_LEN + 1);
+    let mut h = window_hash(&bytes[..SHINGLE_LEN]);
+    set.insert(h);
+    for i in SHINGLE_LEN..bytes.len() {
+        h = h
+            .wrapping_mul(HASH_BASE)
+            .wrapping_add(bytes[i] as u64)
+            .wrapping_sub((bytes[i - SHINGLE_LEN] as u64).wrapping_mul(drop_factor));
+        set.insert(h);
+    }
+    set
+}
+
+fn window_hash(window: &[u8]) -> u64 {
+    window.iter().fold(0u64, |h, &b| {
+        h.wrapping_mul(HASH_BASE).wrapping_add(b as u64)
+    })
+}
+
+fn dice(a: &HashSet<u64>, b: &HashSet<u64>) -> f64 {
+    let (small, large) = if a.len() <= b.len() { (a, b) } else { (b, a) };
+    let shared = small.iter().filter(|h| large.contains(h)).count();
+    let total = a.len() + b.len();
+    if total == 0 {
+        return 1.0;
+    }
+    2.0 * shared as f64 / total as f64
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_rolling_hash_matches_direct_hash() {
+        let text = b"FAILED tests/test_store.py::test_add - AssertionError";
+        let expected: HashSet<u64> = text.windows(SHINGLE_LEN).map(window_hash).collect();
+        assert_eq!(shingles(text), expected);
+        assert_eq!(shingles(b"short"), HashSet::from([window_hash(b"short")]));
+    }
+
+    #[test]
+    fn test_dice() {
+        let a = shingles(b"E   AssertionError: assert 3 == 4\n");
+        let b = shingles(b"ModuleNotFoundError: No module named 'x'\n");
+        assert_eq!(dice(&a, &a), 1.0);
+        assert!(dice(&a, &b) < 0.1);
+        let near = shingles(b"E   AssertionError: assert 3 == 5\n");
+        let ratio = dice(&a, &near);
+        assert!(ratio > 0.5 && ratio < 1.0, "ratio = {ratio}");
+        // 2·3 / (4 + 4), where the Jaccard index would be 3 / 5.
+        let (x, y) = (HashSet::from([1, 2, 3, 4]), HashSet::from([1, 2, 3, 5]));
+        assert_eq!(dice(&x, &y), 0.75);
+    }
+
+    #[test]
+    fn test_check_stagnation() {
+        let log: String = (0..40)
+            .map(|i| format!("FAILED tests/test_orders.py::test_case_{i} - assert {i} == 0\n"))
+            .collect();
+        let near = format!("{log}1 failed\n");
+
+        assert!(check_stagnation(&log, &log, 2, 0.9));
+        assert!(check_stagnation(&log, &near, 2, 0.9));
+        assert!(!check_stagnation(
+            &near,
+            "ImportError: cannot import name\n",
+            3,
+            0.9
+        ));
+        assert!(!check_stagnation("", "", 2, 0.9));
+    }
+}
@@ -48,7 +48,7 @@ impl std::str::FromStr for Tier {
 }
 
 /// Canonical phase names.
-#[derive(Debug, Clone, Hash, PartialEq, Eq, Serialize, Deserialize)]
+#[derive(Debug, Clone, Copy, Hash, PartialEq, Eq, Serialize, Deserialize)]
 #[serde(rename_all = "kebab-case")]
 pub enum Phase {
     Phase0,
@@ -66,6 +66,22 @@ pub enum Phase {
 }
 
 impl Phase {
+    /// Every phase, in pipeline execution order.
+    pub const ALL: [Phase; 12] = [
+        Phase::Phase0,
+        Phase::Interrogate,
+        Phase::InterrogationReview,
+        Phase::GenerateDocs,
+        Phase::DocReview,
+        Phase::WriteSpecs,
+        Phase::HoldoutGenerate,
+        Phase::Implement,
+        Phase::Verify,
+        Phase::HoldoutValidate,
+        Phase::SecurityAudit,
+        Phase::Ship,
+    ];
+
     pub fn as_str(&self) -> &'static str {
         match self {
             Phase::Phase0 => "phase0",
@@ -83,10 +99,36 @@ impl Phase {
         }
     }
 
+    /// Bitmask of the phases each tier skips, one bit per `Phase::ALL` entry.
+    pub fn skip_mask(tier: Tier) -> u16 {
+        Self::skipped_by(tier)
+            .iter()
+            .fold(0, |mask, phase| mask | phase.bit())
+    }
+
+    /// This phase's bit in a `skip_mask`.
+    pub fn bit(self) -> u16 {
+        1 << self as u16
+    }
+
+    /// Key under `[models]` that selects this phase's model.
+    pub fn model_role(&self) -> &'static str {
+        match self {
+            Phase::Phase0 => "routing",
+            Phase::Interrogate | Phase::GenerateDocs => "generation",
+            Phase::InterrogationReview | Phase::DocReview | Phase::Verify | Phase::Ship => "review",
+            Phase::WriteSpecs => "specification",
+            Phase::HoldoutGenerate => "holdout_generate",
+            Phase::Implement => "implementation",
+            Phase::HoldoutValidate => "holdout_validate",
+            Phase::SecurityAudit => "security",
+        }
+    }
+
     /// Which phases each tier skips.
-    pub fn skipped_by(tier: Tier) -> Vec<Phase> {
+    pub fn skipped_by(tier: Tier) -> &'static [Phase] {
         match tier {
-            Tier::Guard => vec![
+            Tier::Guard => &[
                 Phase::Interrogate,
                 Phase::InterrogationReview,
                 Phase::GenerateDocs,
@@ -97,7 +139,7 @@ impl Phase {
                 Phase::Verify,
                 Phase::HoldoutValidate,
             ],
-            Tier::Nano => vec![
+            Tier::Nano => &[
                 Phase::Interrogate,
                 Phase::InterrogationReview,
                 Phase::GenerateDocs,
@@ -107,7 +149,7 @@ impl Phase {
                 Phase::HoldoutValidate,
                 Phase::SecurityAudit,
             ],
-            Tier::Quick => vec![
+            Tier::Quick => &[
                 Phase::InterrogationReview,
                 Phase::GenerateDocs,
                 Phase::DocReview,
@@ -115,14 +157,14 @@ impl Phase {
                 Phase::HoldoutValidate,
                 Phase::SecurityAudit,
             ],
-            Tier::Lite => vec![
+            Tier::Lite => &[
                 Phase::InterrogationReview,
                 Phase::GenerateDocs,
                 Phase::DocReview,
                 Phase::SecurityAudit,
             ],
-            Tier::Standard => vec![Phase::SecurityAudit],
-            Tier::Full | Tier::Auto => vec![],
+            Tier::Standard => &[Phase::SecurityAudit],
+            Tier::Full | Tier::Auto => &[],
         }
     }
 }
@@ -237,23 +279,11 @@ pub struct ModelStylesheet {
 }
 
 impl ModelStylesheet {
-    /// Map a phase name to its assigned model.
-    pub fn get_model(&self, phase: &str) -> &str {
-        let key = match phase {
-            "phase0" => "routing",
-            "interrogate" => "generation",
-            "interrogation-review" | "doc-review" => "review",
-            s if s.starts_with("verify") => "review",
-            "ship" => "review",
-            s if s.starts_with("implement") => "implementation",
-            "generate-docs" => "generation",
-            "security-audit" => "security",
-            "holdout-generate" => "holdout_generate",
-            "holdout-validate" => "holdout_validate",
-            "write-specs" => "specification",
-            _ => return &self.default,
-        };
-        self.overrides.get(key).unwrap_or(&self.default)
+    /// Map a phase to its assigned model.
+    pub fn get_model(&self, phase: &Phase) -> &str {
+        self.overrides
+            .get(phase.model_role())
+            .unwrap_or(&self.default)
     }
 }
 